@@ -4,22 +4,118 @@ Main user interface for viral moment extraction and cut sheet generation.
 """
 
 import streamlit as st
+import json
+import shutil
 import traceback
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src import config
 from src.transcript_utils import get_transcript_from_youtube
-from src.llm_client import extract_moments
-from src.cutsheets import generate_cut_sheets
+from src.llm_client import extract_indexed_moments_stream
+from src.cutsheets import create_fallback_cut_sheet, generate_cut_sheets
 from src.export_utils import to_csv, to_markdown, format_clip_summary, to_ffmpeg_json, srt_to_ffmpeg_json
 
-from src.pdf_utils import clips_to_pdf
-from src.clipping import cut_from_ffmpeg_json
-from src.video_download import download_youtube_video
+# pdf_utils (reportlab), clipping (ffmpeg-python) and video_download (yt-dlp) are
+# imported where they are used so startup doesn't pay for features never clicked.
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_transcript(youtube_url, language):
+    """Fetch a YouTube transcript once per URL/language instead of on every rerun."""
+    return get_transcript_from_youtube(youtube_url, language)
+
+
+def _cut_sheets_or_fallback(moments):
+    """Generate cut sheets for some moments, using fallback cut sheets if every call fails."""
+    try:
+        return generate_cut_sheets(moments)
+    except RuntimeError as e:
+        print(f"[pipeline] Cut sheet generation failed for {len(moments)} moments, using fallback cut sheets: {e}")
+        return [{**moment, "editor_cut_sheet": create_fallback_cut_sheet(moment)} for moment in moments]
+
+
+def _run_pipeline(transcript_text, metadata, status):
+    """Extract moments and generate their cut sheets as overlapping stages.
+
+    Streamed moments are buffered into batches of config.CUT_SHEET_BATCH_SIZE,
+    and each full batch is sent for cut sheet generation right away, so the cut
+    sheet stage runs while later chunks are still being extracted. Workers call
+    generate_cut_sheets directly (st.cache_data needs the script thread);
+    repeat runs are served by the moment and LLM response caches.
+
+    Returns:
+        Moments with cut sheets, in transcript order
+    """
+    batch_size = config.CUT_SHEET_BATCH_SIZE
+    submitted = []  # (chunk_indexes, future) per batch, in arrival order
+    pending = []  # (chunk_index, moment) pairs not yet sent
+    found = 0
+
+    with ThreadPoolExecutor(max_workers=config.MAX_PARALLEL_CUT_SHEET_CALLS) as executor:
+        def submit(batch):
+            indexes = [idx for idx, _ in batch]
+            submitted.append((indexes, executor.submit(_cut_sheets_or_fallback, [moment for _, moment in batch])))
+
+        for item in extract_indexed_moments_stream(transcript_text, metadata):
+            pending.append(item)
+            found += 1
+            if len(pending) >= batch_size:
+                submit(pending)
+                pending = []
+            status.info(f"🎯 Found {found} viral moments so far, generating cut sheets...")
+        if pending:
+            submit(pending)
+
+        # generate_cut_sheets returns one moment per input, in input order
+        indexed = [pair for indexes, future in submitted for pair in zip(indexes, future.result())]
+
+    # Stable sort: moments within a chunk keep the model's order
+    indexed.sort(key=itemgetter(0))
+    return [moment for _, moment in indexed]
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def _cached_download(url):
+    """Download a YouTube video once per URL; later calls return the same local path."""
+    from src.video_download import download_youtube_video
+
+    local_path = download_youtube_video(url)
+    if not os.path.exists(local_path):
+        # Raising keeps a bad path out of the cache
+        raise RuntimeError(f"Downloaded file not found: {local_path}")
+    return local_path
+
+
+@st.cache_resource(show_spinner=False)
+def _gpu_available():
+    """Detect NVENC support once per server process."""
+    from src.clipping import gpu_encoding_available
+
+    return gpu_encoding_available()
+
+
+@st.cache_data(show_spinner=False)
+def _build_exports(moments_json, metadata_json):
+    """Render all export formats once per result set.
+
+    Inputs are JSON strings so Streamlit hashes a single string rather than nested dicts.
+    """
+    from src.pdf_utils import clips_to_pdf
+
+    moments_with_cuts = json.loads(moments_json)
+    metadata = json.loads(metadata_json)
+    return {
+        "csv": to_csv(moments_with_cuts),
+        "md": to_markdown(moments_with_cuts),
+        "pdf": clips_to_pdf(moments_with_cuts, metadata),
+        "ffmpeg": to_ffmpeg_json(moments_with_cuts),
+    }
 
 
 def main():
@@ -47,36 +143,38 @@ def main():
     # Input section
     st.subheader("📺 Input")
 
-    col1, col2 = st.columns([2, 1])
+    # Inputs live in a form so typing doesn't trigger a rerun per keystroke
+    with st.form("generate_form"):
+        col1, col2 = st.columns([2, 1])
 
-    with col1:
-        youtube_url = st.text_input(
-            "YouTube URL (optional)",
-            placeholder="youtube.com/watch?v=dQw4w9WgXcQ or youtu.be/dQw4w9WgXcQ",
-            help="Accepts any YouTube format: watch, youtu.be, shorts, embed (auto-normalized)"
-        )
+        with col1:
+            youtube_url = st.text_input(
+                "YouTube URL (optional)",
+                placeholder="youtube.com/watch?v=dQw4w9WgXcQ or youtu.be/dQw4w9WgXcQ",
+                help="Accepts any YouTube format: watch, youtu.be, shorts, embed (auto-normalized)"
+            )
 
-    with col2:
-        language = st.selectbox(
-            "Language",
-            options=["en", "es", "fr", "de", "it", "pt"],
-            index=0,
-            help="Transcript language"
-        )
+        with col2:
+            language = st.selectbox(
+                "Language",
+                options=["en", "es", "fr", "de", "it", "pt"],
+                index=0,
+                help="Transcript language"
+            )
 
-    transcript_input = st.text_area(
-        "Or paste transcript directly (optional)",
-        height=200,
-        placeholder="[00:00.56–00:02.63] Then the last one which is kind of the...\n[00:02.63–00:05.12] most important thing...",
-        help="Paste a formatted transcript with timestamps"
-    )
+        transcript_input = st.text_area(
+            "Or paste transcript directly (optional)",
+            height=200,
+            placeholder="[00:00.56–00:02.63] Then the last one which is kind of the...\n[00:02.63–00:05.12] most important thing...",
+            help="Paste a formatted transcript with timestamps"
+        )
 
-    # Generate button
-    generate_button = st.button(
-        "🚀 Generate Viral Clips",
-        type="primary",
-        use_container_width=True
-    )
+        # Generate button
+        generate_button = st.form_submit_button(
+            "🚀 Generate Viral Clips",
+            type="primary",
+            use_container_width=True
+        )
 
     if generate_button:
         # Validate input
@@ -94,17 +192,14 @@ def main():
                     st.info("📝 Using provided transcript")
                 else:
                     st.info(f"🎥 Fetching transcript from YouTube...")
-                    transcript_text, metadata = get_transcript_from_youtube(youtube_url, language)
+                    transcript_text, metadata = _cached_transcript(youtube_url, language)
                     st.success("✅ Transcript fetched successfully")
 
-                # Extract moments
-                st.info("🎯 Extracting viral moments...")
-                moments = extract_moments(transcript_text, metadata)
-                st.success(f"✅ Found {len(moments)} potential viral moments")
-
-                # Generate cut sheets
-                st.info("📋 Generating editor cut sheets...")
-                moments_with_cuts = generate_cut_sheets(moments)
+                # Extract moments and generate cut sheets as they arrive
+                status = st.empty()
+                status.info("🎯 Extracting viral moments...")
+                moments_with_cuts = _run_pipeline(transcript_text, metadata, status)
+                status.success(f"✅ Found {len(moments_with_cuts)} potential viral moments")
                 st.success("✅ Cut sheets generated")
 
                 # Store results in session state
@@ -156,7 +251,13 @@ def main():
                 else:
                     with st.spinner("Downloading video..."):
                         try:
-                            local_path = download_youtube_video(url_for_download.strip())
+                            local_path = _cached_download(url_for_download.strip())
+                            if not os.path.exists(local_path):
+                                # Cached file was removed from disk; download it again to the same
+                                # <video_id>.mp4 path, which makes this URL's cache entry valid again
+                                from src.video_download import download_youtube_video
+
+                                local_path = download_youtube_video(url_for_download.strip())
                             st.session_state["downloaded_video_path"] = local_path
                             st.success(f"Video downloaded to: {local_path}")
                         except Exception as e:
@@ -178,19 +279,31 @@ def main():
                 key="video_source_choice",
             )
 
-            uploaded_video = None
-            if source_choice == "Uploaded file":
-                uploaded_video = st.file_uploader(
-                    "Upload the matching video file (MP4/MOV)",
-                    type=["mp4", "mov", "m4v"],
-                    key="autoclip_upload",
-                )
-
-            srt_file = None
-            if mode == "SRT file":
-                srt_file = st.file_uploader("Upload .srt file", type=["srt"], key="srt_uploader")
-
-            if st.button("Run Auto-Clipper", use_container_width=True):
+            # The radios above stay outside the form so they can show/hide the uploaders;
+            # uploads are only sent to the server when the form is submitted.
+            with st.form("autoclip_form"):
+                uploaded_video = None
+                if source_choice == "Uploaded file":
+                    uploaded_video = st.file_uploader(
+                        "Upload the matching video file (MP4/MOV)",
+                        type=["mp4", "mov", "m4v"],
+                        key="autoclip_upload",
+                    )
+
+                srt_file = None
+                if mode == "SRT file":
+                    srt_file = st.file_uploader("Upload .srt file", type=["srt"], key="srt_uploader")
+
+                use_gpu = False
+                if _gpu_available():
+                    use_gpu = st.checkbox(
+                        "Re-encode on NVIDIA GPU",
+                        help="Frame-accurate cuts using NVENC. Off = fast stream copy.",
+                    )
+
+                run_autoclipper = st.form_submit_button("Run Auto-Clipper", use_container_width=True)
+
+            if run_autoclipper:
                 # Resolve video_path based on choice
                 video_path = None
 
@@ -204,7 +317,8 @@ def main():
                         tmp_dir = tempfile.mkdtemp()
                         temp_path = os.path.join(tmp_dir, uploaded_video.name)
                         with open(temp_path, "wb") as f:
-                            f.write(uploaded_video.read())
+                            # Stream in 1 MiB blocks so large videos never sit fully in memory
+                            shutil.copyfileobj(uploaded_video, f, length=1024 * 1024)
                         video_path = temp_path
 
                 else:  # "Downloaded from URL"
@@ -225,7 +339,9 @@ def main():
                             srt_text = srt_file.read().decode("utf-8", errors="ignore")
                             ffmpeg_json = srt_to_ffmpeg_json(srt_text)
 
-                        clip_paths = cut_from_ffmpeg_json(video_path, ffmpeg_json, output_dir="clips")
+                        from src.clipping import cut_from_ffmpeg_json
+
+                        clip_paths = cut_from_ffmpeg_json(video_path, ffmpeg_json, output_dir="clips", use_gpu=use_gpu)
 
                         st.success(f"Generated {len(clip_paths)} clips into the 'clips' folder:")
                         for p in clip_paths:
@@ -381,11 +497,15 @@ def display_download_section(moments_with_cuts):
     col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
 
     try:
-        # Generate export data
-        csv_data = to_csv(moments_with_cuts)
-        md_data = to_markdown(moments_with_cuts)
-        pdf_data = clips_to_pdf(moments_with_cuts, st.session_state.get("metadata"))
-        ffmpeg_json = to_ffmpeg_json(moments_with_cuts)
+        # Generate export data (cached across reruns)
+        exports = _build_exports(
+            json.dumps(moments_with_cuts, sort_keys=True),
+            json.dumps(st.session_state.get("metadata"), sort_keys=True),
+        )
+        csv_data = exports["csv"]
+        md_data = exports["md"]
+        pdf_data = exports["pdf"]
+        ffmpeg_json = exports["ffmpeg"]
 
         with col1:
             st.download_button(
@@ -1,21 +1,54 @@
-"""Simple caching utilities for parsed moments.
+"""Simple caching utilities for parsed moments and LLM responses.
 
-Provides file-based caching to avoid re-processing identical transcripts.
+Provides file-based caching to avoid re-processing identical transcripts,
+re-fetching transcripts for the same video, and re-sending identical
+deterministic prompts.
 """
 
 import os
+import copy
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
+import functools
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from src import config
 
+try:
+    import xxhash  # Optional: much faster than md5 for large transcripts
+except ImportError:
+    xxhash = None
+
+try:
+    import orjson  # Optional: faster cache reads/writes than stdlib json
+except ImportError:
+    orjson = None
+
+# Characters encoded per hasher update, so huge transcripts are never copied whole
+_HASH_CHUNK_CHARS = 1 << 16
+
+# In-process LRUs in front of the file cache, keyed by cache key: parsed moment
+# lists, and LLM responses (kept apart so one transcript's many chunk responses
+# cannot evict the moment lists). Accessed from worker threads, so every read
+# and write holds _MEM_CACHE_LOCK.
+_MEM_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_LLM_MEM_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_MEM_CACHE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> str:
+    """Create a directory once per process; later calls skip the filesystem."""
+    os.makedirs(path, exist_ok=True)
+    return path
+
 
 def _get_cache_dir() -> str:
     """Get the cache directory, creating it if needed."""
-    cache_dir = config.CACHE_DIR
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir, exist_ok=True)
-    return cache_dir
+    return _ensure_dir(config.CACHE_DIR)
 
 
 def _build_cache_key(transcript_text: str, video_metadata: Optional[Dict] = None) -> str:
@@ -39,8 +72,12 @@ def _build_cache_key(transcript_text: str, video_metadata: Optional[Dict] = None
         if video_id:
             return f"video_{video_id}_{language}"
 
-    # Fallback to transcript hash
-    transcript_hash = hashlib.md5(transcript_text.encode('utf-8')).hexdigest()
+    # Fallback to transcript hash (not security-sensitive, only a cache key).
+    # Feed the hasher in slices; the digest matches hashing the whole encoded text.
+    hasher = xxhash.xxh3_64() if xxhash is not None else hashlib.md5()
+    for i in range(0, len(transcript_text), _HASH_CHUNK_CHARS):
+        hasher.update(transcript_text[i:i + _HASH_CHUNK_CHARS].encode('utf-8'))
+    transcript_hash = hasher.hexdigest()
     return f"transcript_{transcript_hash}"
 
 
@@ -50,6 +87,52 @@ def _get_cache_path(cache_key: str) -> str:
     return os.path.join(cache_dir, f"{cache_key}.json")
 
 
+def _read_cache_file(cache_path: str) -> Any:
+    """Load a JSON cache file."""
+    with open(cache_path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _write_cache_file(cache_path: str, data: Any) -> None:
+    """Write data to a JSON cache file.
+
+    Writes to a temporary file in the same directory and renames it into place,
+    so concurrent readers never see a half-written file.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _remember(cache: "OrderedDict[str, Any]", max_entries: int, cache_key: str, value: Any) -> None:
+    """Store a value in an in-memory LRU, evicting the oldest entries beyond max_entries."""
+    with _MEM_CACHE_LOCK:
+        cache[cache_key] = value
+        cache.move_to_end(cache_key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+def _recall(cache: "OrderedDict[str, Any]", cache_key: str) -> Any:
+    """Return a value from an in-memory LRU (marking it recently used), or None."""
+    with _MEM_CACHE_LOCK:
+        value = cache.get(cache_key)
+        if value is not None:
+            cache.move_to_end(cache_key)
+        return value
+
+
 def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = None) -> Optional[List[Dict[str, Any]]]:
     """Retrieve cached moments if available.
 
@@ -65,13 +148,18 @@ def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = No
 
     try:
         cache_key = _build_cache_key(transcript_text, video_metadata)
+
+        # Check RAM before touching disk; callers get their own copy to mutate
+        moments = _recall(_MEM_CACHE, cache_key)
+        if moments is not None:
+            return copy.deepcopy(moments)
+
         cache_path = _get_cache_path(cache_key)
 
         if not os.path.exists(cache_path):
             return None
 
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            cached_data = json.load(f)
+        cached_data = _read_cache_file(cache_path)
 
         # Validate cache structure
         if not isinstance(cached_data, dict) or 'moments' not in cached_data:
@@ -84,7 +172,8 @@ def get_cached_moments(transcript_text: str, video_metadata: Optional[Dict] = No
             return None
 
         print(f"[cache] Cache hit for key {cache_key} – returning {len(moments)} cached moments")
-        return moments
+        _remember(_MEM_CACHE, config.CACHE_MEMORY_ENTRIES, cache_key, moments)
+        return copy.deepcopy(moments)
 
     except Exception as e:
         print(f"[cache] Error reading cache: {e}")
@@ -112,8 +201,10 @@ def save_moments_to_cache(moments: List[Dict[str, Any]], transcript_text: str, v
             'moments': moments
         }
 
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2, ensure_ascii=False)
+        _write_cache_file(cache_path, cache_data)
+
+        # Keep a private copy so later changes to the caller's moments don't leak into the cache
+        _remember(_MEM_CACHE, config.CACHE_MEMORY_ENTRIES, cache_key, copy.deepcopy(moments))
 
         print(f"[cache] Saved {len(moments)} moments to cache with key {cache_key}")
 
@@ -121,8 +212,153 @@ def save_moments_to_cache(moments: List[Dict[str, Any]], transcript_text: str, v
         print(f"[cache] Error saving to cache: {e}")
 
 
+def _transcript_cache_key(video_id: str, language: str) -> str:
+    """Cache key for a fetched YouTube transcript."""
+    return f"yt_transcript_{video_id}_{language}"
+
+
+def get_cached_transcript(video_id: str, language: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Retrieve a previously fetched transcript for a video, if available.
+
+    Transcripts for a given video and language do not change, so entries never expire.
+
+    Args:
+        video_id: 11-character YouTube video ID
+        language: Transcript language code
+
+    Returns:
+        Tuple of (transcript_text, metadata) or None if not found/disabled
+    """
+    if not config.CACHE_ENABLED:
+        return None
+
+    try:
+        cache_path = _get_cache_path(_transcript_cache_key(video_id, language))
+        if not os.path.exists(cache_path):
+            return None
+
+        cached_data = _read_cache_file(cache_path)
+        if not isinstance(cached_data, dict) or not isinstance(cached_data.get('text'), str):
+            print(f"[cache] Invalid transcript cache structure for video {video_id}")
+            return None
+
+        print(f"[cache] Transcript cache hit for video {video_id} ({language})")
+        return cached_data['text'], cached_data.get('metadata') or {}
+
+    except Exception as e:
+        print(f"[cache] Error reading transcript cache: {e}")
+        return None
+
+
+def save_transcript_to_cache(video_id: str, language: str, transcript_text: str, metadata: Dict[str, Any]) -> None:
+    """Save a fetched transcript and its metadata to cache.
+
+    Args:
+        video_id: 11-character YouTube video ID
+        language: Transcript language code
+        transcript_text: Formatted transcript text
+        metadata: Video metadata from the transcript fetch
+    """
+    if not config.CACHE_ENABLED:
+        return
+
+    try:
+        cache_key = _transcript_cache_key(video_id, language)
+        _write_cache_file(_get_cache_path(cache_key), {
+            'cache_key': cache_key,
+            'text': transcript_text,
+            'metadata': metadata,
+        })
+        print(f"[cache] Saved transcript to cache with key {cache_key}")
+
+    except Exception as e:
+        print(f"[cache] Error saving transcript to cache: {e}")
+
+
+def build_llm_cache_key(version: str, model: str, system_prompt: str, user_prompt: str) -> str:
+    """Build a cache key for a deterministic LLM call.
+
+    The key covers the exact prompts the model sees; callers that want
+    formatting-insensitive hits should normalize their input before building the prompt.
+
+    Args:
+        version: Prompt version tag; bump it to invalidate old responses
+        model: Model name
+        system_prompt: System message content
+        user_prompt: User message content
+
+    Returns:
+        Stable cache key string
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (version, model, system_prompt, user_prompt):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b"\x00")
+    return f"llm_{hasher.hexdigest()}"
+
+
+def get_cached_response(cache_key: str) -> Optional[str]:
+    """Retrieve a cached LLM response if available and not expired.
+
+    Args:
+        cache_key: Key from build_llm_cache_key
+
+    Returns:
+        Cached response text or None if not found/expired/disabled
+    """
+    if not config.CACHE_ENABLED:
+        return None
+
+    try:
+        entry = _recall(_LLM_MEM_CACHE, cache_key)
+        if entry is None:
+            cache_path = _get_cache_path(cache_key)
+            if not os.path.exists(cache_path):
+                return None
+            entry = _read_cache_file(cache_path)
+            if not isinstance(entry, dict) or not isinstance(entry.get('response'), str):
+                print(f"[cache] Invalid cache structure for key {cache_key}")
+                return None
+
+        if time.time() - entry.get('created_at', 0) > config.LLM_CACHE_TTL_SECONDS:
+            return None
+
+        _remember(_LLM_MEM_CACHE, config.LLM_CACHE_MEMORY_ENTRIES, cache_key, entry)
+        return entry['response']
+
+    except Exception as e:
+        print(f"[cache] Error reading cache: {e}")
+        return None
+
+
+def save_response_to_cache(cache_key: str, response: str) -> None:
+    """Save an LLM response to cache.
+
+    Args:
+        cache_key: Key from build_llm_cache_key
+        response: Raw response text
+    """
+    if not config.CACHE_ENABLED:
+        return
+
+    try:
+        entry = {
+            'cache_key': cache_key,
+            'created_at': time.time(),
+            'response': response
+        }
+        _write_cache_file(_get_cache_path(cache_key), entry)
+        _remember(_LLM_MEM_CACHE, config.LLM_CACHE_MEMORY_ENTRIES, cache_key, entry)
+
+    except Exception as e:
+        print(f"[cache] Error saving to cache: {e}")
+
+
 def clear_cache() -> None:
     """Clear all cached files."""
+    with _MEM_CACHE_LOCK:
+        _MEM_CACHE.clear()
+        _LLM_MEM_CACHE.clear()
     try:
         cache_dir = _get_cache_dir()
         cache_files = [f for f in os.listdir(cache_dir) if f.endswith('.json')]
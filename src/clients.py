@@ -0,0 +1,109 @@
+"""Shared API clients for Nio Transcribe.
+
+Clients are built once per process with st.cache_resource and reused across
+Streamlit reruns and sessions, so connection pools and TLS sessions survive
+between interactions.
+"""
+
+import atexit
+import importlib.util
+
+import httpx
+import requests
+import streamlit as st
+from openai import AsyncOpenAI, OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src import config
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]"); fall back to HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _httpx_client_kwargs() -> dict:
+    """Transport settings shared by the sync and async OpenAI HTTP clients."""
+    return {
+        "http2": _HTTP2_AVAILABLE,
+        "timeout": config.LLM_HTTP_TIMEOUT_SECONDS,
+        "limits": httpx.Limits(
+            max_connections=config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client() -> OpenAI:
+    """Get the shared OpenAI client.
+
+    Falls back to the OPENAI_API_KEY environment variable if config has not
+    been initialized. Requests go through one pooled httpx client (HTTP/2 when
+    available), which is closed at interpreter exit.
+
+    Returns:
+        Cached OpenAI client instance
+    """
+    http_client = httpx.Client(**_httpx_client_kwargs())
+    atexit.register(http_client.close)
+    return OpenAI(api_key=config.OPENAI_API_KEY, http_client=http_client)
+
+
+def create_async_openai_client() -> AsyncOpenAI:
+    """Create an AsyncOpenAI client with the same transport settings as get_openai_client.
+
+    Not cached: an async connection pool is bound to the event loop it was
+    used on, so callers should create one per asyncio.run() and close it
+    (e.g. `async with create_async_openai_client() as aclient:`).
+
+    Returns:
+        New AsyncOpenAI client instance
+    """
+    return AsyncOpenAI(
+        api_key=config.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(**_httpx_client_kwargs()),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_apify_session() -> requests.Session:
+    """Get the shared HTTP session used for Apify API calls.
+
+    HTTPS requests go through a pooled adapter that retries gateway errors
+    (502/503/504) on GET with exponential backoff. POST (a paid actor run)
+    is only retried when the connection could not be made: a gateway error
+    does not prove the run failed, so re-sending could start a duplicate run.
+    Once retries are exhausted the last response is returned so callers can
+    report its status and body.
+
+    Returns:
+        Cached requests.Session with keep-alive connections
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+def create_apify_async_client() -> httpx.AsyncClient:
+    """Create an async HTTP client for overlapping Apify calls across videos.
+
+    Not cached for the same reason as create_async_openai_client: use one per
+    asyncio.run() and close it when done. Connection failures are retried by
+    the transport; gateway errors are reported to the caller.
+
+    Returns:
+        New httpx.AsyncClient (HTTP/2 when available)
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=32),
+        retries=3,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=300)
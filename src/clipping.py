@@ -1,58 +1,147 @@
 import ffmpeg
+import functools
 import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def cut_video(input_video: str, start: str, end: str, output_path: str) -> None:
+@functools.lru_cache(maxsize=1)
+def gpu_encoding_available() -> bool:
+    """Return True if an NVIDIA GPU and an ffmpeg build with h264_nvenc are present."""
+    if not shutil.which("nvidia-smi") or not shutil.which("ffmpeg"):
+        return False
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return "h264_nvenc" in result.stdout
+
+def cut_video(input_video: str, start: str, end: str, output_path: str, fast: bool = True, use_gpu: bool = False) -> None:
     """
     Cut a segment from input_video into output_path using absolute start/end timestamps.
 
     start and end are strings like 'HH:MM:SS.mmm' (or MM:SS.mmm), and we convert them
     to seconds, then tell ffmpeg to seek to start and cut for (end - start) seconds.
     This is more reliable than using `to=` with timestamps.
+
+    Thin wrapper around cut_video_seconds for callers that have timestamp strings.
     """
     # Convert to seconds
     start_sec = _timestamp_to_seconds(start)
     end_sec = _timestamp_to_seconds(end)
     duration = max(0.0, end_sec - start_sec)
+    cut_video_seconds(input_video, start_sec, duration, output_path, fast=fast, use_gpu=use_gpu)
+
+def cut_video_seconds(input_video: str, start_sec: float, duration: float, output_path: str, fast: bool = True, use_gpu: bool = False) -> None:
+    """
+    Cut `duration` seconds starting at `start_sec` from input_video into output_path.
+
+    Streams are always copied (no re-encode). With fast=True (default) the seek is an
+    input option, so ffmpeg jumps straight to the keyframe at or before start; with
+    fast=False the seek is an output option, so ffmpeg reads from the beginning and
+    drops packets until start, which is slower but lands closer to the requested point.
+    avoid_negative_ts='make_zero' shifts the copied packets so the clip starts at t=0,
+    preventing black leading frames and A/V desync in players.
+
+    With use_gpu=True the video is re-encoded instead of copied, decoding with CUDA
+    and encoding with h264_nvenc (audio is still copied). Cuts are then frame-accurate
+    and the encode stays off the CPU. See gpu_encoding_available().
+    """
+    if use_gpu:
+        input_kwargs = {"hwaccel": "cuda", "hwaccel_output_format": "cuda"}
+        codec_kwargs = {"vcodec": "h264_nvenc", "acodec": "copy"}
+    else:
+        input_kwargs = {}
+        codec_kwargs = {"c": "copy"}
+
+    if fast:
+        stream = ffmpeg.input(input_video, ss=start_sec, **input_kwargs)
+        seek_kwargs = {}
+    else:
+        stream = ffmpeg.input(input_video, **input_kwargs)
+        seek_kwargs = {"ss": start_sec}
 
-    stream = ffmpeg.input(input_video, ss=start_sec)
     stream = ffmpeg.output(
         stream,
         output_path,
         t=duration,
-        c='copy',
         map='0',
+        avoid_negative_ts='make_zero',
+        **codec_kwargs,
+        **seek_kwargs,
     )
     ffmpeg.run(stream, overwrite_output=True)
 
+def _batch_argv(input_video: str, segments: list[tuple], fast: bool = True, use_gpu: bool = False) -> list[str]:
+    """Build the ffmpeg argv for cut_video_batch (one input and one output per segment)."""
+    input_args = ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"] if use_gpu else []
+    codec_args = ["-c:v", "h264_nvenc", "-c:a", "copy"] if use_gpu else ["-c", "copy"]
+
+    argv = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+    for start_sec, _, _ in segments:
+        if fast:
+            argv += ["-ss", str(start_sec)]
+        argv += input_args + ["-i", input_video]
+
+    for i, (start_sec, duration, output_path) in enumerate(segments):
+        argv += ["-map", str(i), "-t", str(duration)]
+        if not fast:
+            argv += ["-ss", str(start_sec)]
+        argv += codec_args + ["-avoid_negative_ts", "make_zero", output_path]
+    return argv
+
+def cut_video_batch(input_video: str, segments: list[tuple], fast: bool = True, use_gpu: bool = False) -> None:
+    """
+    Cut several segments from input_video with a single ffmpeg process.
+
+    Each segment is a (start_sec, duration, output_path) tuple. The input is opened
+    once per segment with its own seek, so ffmpeg still only reads the needed ranges
+    while process startup is paid once for the whole batch. Seek and codec behaviour
+    match cut_video_seconds.
+
+    This is the hot path for batch clipping, so it calls ffmpeg directly with a
+    prebuilt argv instead of going through ffmpeg-python's graph builder, and keeps
+    ffmpeg quiet unless it fails.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error
+    """
+    result = subprocess.run(
+        _batch_argv(input_video, segments, fast=fast, use_gpu=use_gpu),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="ignore").strip()
+        raise RuntimeError(f"ffmpeg failed ({result.returncode}): {stderr}")
+
 def _timestamp_to_seconds(ts: str) -> float:
-    # Accepts HH:MM:SS.mmm or HH:MM:SS.xx or MM:SS.xx
-    import re
-    ts = ts.strip()
-    m = re.match(r"(?:(\d+):)?(\d+):(\d+)[.,](\d+)", ts)
-    if not m:
-        # fallback: try without ms
-        m = re.match(r"(?:(\d+):)?(\d+):(\d+)", ts)
-        if not m:
-            return 0.0
-        h, m_, s = m.groups(default="0")
-        ms = "0"
-    else:
-        h, m_, s, ms = m.groups(default="0")
-    h = int(h or 0)
-    m_ = int(m_ or 0)
-    s = int(s or 0)
-    ms = int(ms or 0)
-    return h * 3600 + m_ * 60 + s + ms / (1000 if len(str(ms)) == 3 else 100)
-
-def _seconds_to_timestamp(secs: float) -> str:
-    h = int(secs // 3600)
-    m = int((secs % 3600) // 60)
-    s = int(secs % 60)
-    ms = int(round((secs - int(secs)) * 1000))
-    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
-
-def cut_from_ffmpeg_json(input_video: str, ffmpeg_json: str, output_dir: str = "clips") -> list[str]:
+    # Accepts HH:MM:SS.mmm, HH:MM:SS.xx, MM:SS.xx or SS.xx ("," also allowed as decimal mark)
+    parts = ts.strip().replace(",", ".").split(":")
+    try:
+        secs = float(parts[-1])
+        mins = int(parts[-2]) if len(parts) > 1 else 0
+        hrs = int(parts[-3]) if len(parts) > 2 else 0
+    except ValueError:
+        return 0.0
+    return hrs * 3600 + mins * 60 + secs
+
+def _cut_batch(task: tuple) -> None:
+    """Cut one batch of padded clips. Used as the worker for parallel clipping.
+
+    Args:
+        task: Tuple of (input_video, segments, use_gpu) as accepted by cut_video_batch
+    """
+    input_video, segments, use_gpu = task
+    cut_video_batch(input_video, segments, use_gpu=use_gpu)
+
+
+def cut_from_ffmpeg_json(input_video: str, ffmpeg_json: str, output_dir: str = "clips", use_gpu: bool = False) -> list[str]:
     data = json.loads(ffmpeg_json)
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -60,7 +149,7 @@ def cut_from_ffmpeg_json(input_video: str, ffmpeg_json: str, output_dir: str = "
     pre_roll = 1.0  # seconds before start
     post_roll = 2.0  # seconds after end
 
-    outputs: list[str] = []
+    segments: list[tuple] = []
     for clip in data:
         idx = clip.get("index", 0)
         label = str(clip.get("label", f"CLIP_{idx}")).replace(" ", "_")
@@ -71,12 +160,20 @@ def cut_from_ffmpeg_json(input_video: str, ffmpeg_json: str, output_dir: str = "
         start_sec = max(0.0, _timestamp_to_seconds(start) - pre_roll)
         end_sec = max(start_sec, _timestamp_to_seconds(end) + post_roll)
 
-        # Convert back to timestamp
-        start_padded = _seconds_to_timestamp(start_sec)
-        end_padded = _seconds_to_timestamp(end_sec)
-
         filename = f"{idx:02d}_{label}.mp4"
         out_path = out_dir / filename
-        cut_video(input_video, start_padded, end_padded, str(out_path))
-        outputs.append(str(out_path))
+        segments.append((start_sec, end_sec - start_sec, str(out_path)))
+
+    if not segments:
+        return []
+
+    # Spread the clips over one ffmpeg process per worker: each process cuts a batch of
+    # clips, and the batches run side by side. Threads are enough since ffmpeg does the work.
+    max_workers = min(os.cpu_count() or 1, len(segments))
+    tasks = [(input_video, segments[i::max_workers], use_gpu) for i in range(max_workers)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_cut_batch, tasks))
+
+    # Report outputs in the clip order of the input JSON
+    outputs: list[str] = [out_path for _, _, out_path in segments]
     return outputs
@@ -59,11 +59,26 @@ FAST_MODEL = "gpt-4.1-mini"
 CHARS_PER_CHUNK = 9000  # Increased from ~5000 for fewer API calls
 MAX_MOMENTS_PER_CHUNK = 3  # Limit moments per chunk for speed
 MAX_PARALLEL_CHUNKS = 3  # Parallel processing limit
+CHUNKS_PER_REQUEST = 1  # Pack up to this many small chunks into one LLM request (1 = one chunk per request)
 MOMENT_SAFETY_LIMIT = 5  # Hard limit to protect downstream processing
+USE_BATCH_API = False  # Send chunks via the OpenAI Batch API (~50% cheaper, minutes to hours of latency)
+BATCH_POLL_INTERVAL_SECONDS = 15  # How often to check a submitted batch for completion
+
+# Cut Sheet Performance Settings
+CUT_SHEET_BATCH_SIZE = 4  # Moments per cut sheet LLM call
+MAX_PARALLEL_CUT_SHEET_CALLS = 4  # Concurrent cut sheet LLM calls
 
 # Cache Settings
 CACHE_ENABLED = True
 CACHE_DIR = ".nio_cache"
+CACHE_MEMORY_ENTRIES = 32  # Parsed results kept in RAM in front of the file cache
+LLM_CACHE_MEMORY_ENTRIES = 256  # LLM responses kept in RAM (separate LRU, so they never evict parsed results)
+LLM_CACHE_TTL_SECONDS = 86400  # Lifetime of cached deterministic LLM responses
+
+# OpenAI HTTP Transport Settings
+LLM_HTTP_TIMEOUT_SECONDS = 90
+LLM_MAX_CONNECTIONS = 64
+LLM_MAX_KEEPALIVE_CONNECTIONS = 32
 
 
 def initialize_config() -> None:
@@ -3,12 +3,26 @@
 Takes extracted moments and generates detailed editor cut sheets.
 """
 
+import json
 import re
 from typing import List, Dict, Any
-from src.llm_client import call_llm
+from src import config
+from src.llm_client import call_llm_many
+from src.extraction import persona_caption_values
 
 
-# The exact CUT_SHEET_PROMPT as specified in requirements
+# Separators between start and end in a moment's timestamps field
+_TS_SPLIT_RE = re.compile(r'[–—-]')
+# Version tag for cached cut sheet responses; bump whenever CUT_SHEET_PROMPT changes
+CUT_SHEET_PROMPT_VERSION = "cutsheet-v2"
+
+# Runs of characters not allowed in an UPPER_SNAKE_CASE clip label
+_NON_ALNUM_RE = re.compile(r'[^A-Z0-9]+')
+
+# The CUT_SHEET_PROMPT as specified in requirements, asking for JSON output
+# matching CUT_SHEET_RESPONSE_FORMAT instead of prose cut sheets.
+# Sent as the system message so every request starts with the same bytes and
+# OpenAI can serve it from its prompt-prefix cache; keep it free of interpolation.
 CUT_SHEET_PROMPT = r"""
 You are optimizing already-extracted viral moments for a short-form video editor.
 
@@ -34,20 +48,12 @@ PERSONA CAPTION LINES
 - Catholic: ...
 
 TASK:
-For EACH moment you receive, keep the original content untouched, and ADD an "EDITOR
-CUT SHEET" section directly under it.
+For EACH moment you receive, write an EDITOR CUT SHEET. Return a JSON object
+{"items": [...]} with exactly one cut sheet per moment, in the same order as the input.
 
 Do NOT change any quotes or captions.
 
-For every moment, output exactly this structure:
-
-MOMENT HEADER
-[unchanged, copy from input]
-
-PERSONA CAPTION LINES
-[unchanged, copy from input]
-
-EDITOR CUT SHEET
+Every cut sheet has these fields:
 - clip_label: [UPPER_SNAKE_CASE name for the moment]
 - in_point: [copy start timestamp from moment header]
 - out_point: [copy end timestamp from moment header]
@@ -55,7 +61,7 @@ EDITOR CUT SHEET
 - crop_note: [1 short line: e.g. "tight on face, slow push in", "medium shot, quick punch-in on last
 line"]
 - opening_hook_subtitle: [1–2 lines under 3 seconds, strongest idea in the quote]
-- emphasis_words_caps: [3–8 words or phrases from the quote to be in ALL CAPS in subtitles]
+- emphasis_words_caps: [list of 3–8 words or phrases from the quote to be in ALL CAPS in subtitles]
 - pacing_note: [e.g. "fast, no pauses", "let last line breathe", "trim any filler before the hook"]
 - b_roll_ideas: [optional; only if naturally obvious, 1 short line or "none"]
 - text_on_screen_idea: [optional big text word/phrase or "none"]
@@ -79,17 +85,23 @@ RULES:
 def format_moments_for_cutsheet_prompt(moments: List[Dict[str, Any]]) -> str:
     """Format extracted moments into the text format expected by the cut sheet prompt.
 
+    Moment blocks are separated by a line of "=" characters.
+
     Args:
         moments: List of moment dictionaries from extraction
 
     Returns:
         Formatted text string with all moments
     """
-    formatted_blocks = []
+    separator = "=" * 60
+    buf: List[str] = []
 
     for moment in moments:
+        if buf:
+            buf.extend(("", separator, ""))
+
         # Build moment header
-        header_lines = [
+        buf.extend((
             "MOMENT HEADER",
             f"- timestamps: {moment.get('timestamps', '')}",
             f"- quote: \"{moment.get('quote', '')}\"",
@@ -97,194 +109,112 @@ def format_moments_for_cutsheet_prompt(moments: List[Dict[str, Any]]) -> str:
             f"- viral trigger: {moment.get('viral_trigger', '')}",
             f"- why it hits: {moment.get('why_it_hits', '')}",
             f"- energy tag: {moment.get('energy_tag', '')}",
-            f"- flags: {', '.join(moment.get('flags', []))}" if moment.get('flags') else "- flags: "
-        ]
+            f"- flags: {', '.join(moment.get('flags', []))}" if moment.get('flags') else "- flags: ",
+        ))
 
         # Build persona caption lines
-        persona_lines = ["", "PERSONA CAPTION LINES"]
-        captions = moment.get('persona_captions', {})
-
-        persona_lines.append(f"- Historian: {captions.get('historian', '')}")
-        persona_lines.append(f"- Thomist: {captions.get('thomist', '')}")
-        persona_lines.append(f"- Ex-Protestant: {captions.get('ex_protestant', '')}")
-        persona_lines.append(f"- Meme Catholic: {captions.get('meme_catholic', '')}")
-        persona_lines.append(f"- Old World Catholic: {captions.get('old_world_catholic', '')}")
-        persona_lines.append(f"- Catholic: {captions.get('catholic', '')}")
-
-        # Combine into single block
-        block = "\n".join(header_lines + persona_lines)
-        formatted_blocks.append(block)
-
-    return "\n\n" + "="*60 + "\n\n".join([""] + formatted_blocks)
-
-
-def parse_cut_sheet_response(response_text: str, original_moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Parse GPT's cut sheet response and merge with original moments.
+        historian, thomist, ex_protestant, meme_catholic, old_world_catholic, catholic = (
+            persona_caption_values(moment.get('persona_captions'))
+        )
+        buf.extend((
+            "",
+            "PERSONA CAPTION LINES",
+            f"- Historian: {historian}",
+            f"- Thomist: {thomist}",
+            f"- Ex-Protestant: {ex_protestant}",
+            f"- Meme Catholic: {meme_catholic}",
+            f"- Old World Catholic: {old_world_catholic}",
+            f"- Catholic: {catholic}",
+        ))
+
+    return "\n".join(buf)
+
+
+# Default values for every cut sheet field; also the set of field names we accept
+CUT_SHEET_DEFAULTS: Dict[str, Any] = {
+    "clip_label": "",
+    "in_point": "",
+    "out_point": "",
+    "aspect_ratio": "9:16",
+    "crop_note": "",
+    "opening_hook_subtitle": "",
+    "emphasis_words_caps": [],
+    "pacing_note": "",
+    "b_roll_ideas": "",
+    "text_on_screen_idea": "",
+    "silence_handling": "none",
+    "thumbnail_text": "",
+    "thumbnail_face_cue": "",
+    "platform_priority": "All",
+    "use_persona_caption": ""
+}
+
+PLATFORM_PRIORITIES = ["TikTok", "Reels", "YouTube Shorts", "All"]
+
+# Per-field JSON schema overrides; every other cut sheet field is a plain string
+_FIELD_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "emphasis_words_caps": {"type": "array", "items": {"type": "string"}},
+    "platform_priority": {"type": "string", "enum": PLATFORM_PRIORITIES},
+}
+
+# Strict JSON schema for a single cut sheet: all fields required, no extras
+_CUT_SHEET_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {field: _FIELD_SCHEMAS.get(field, {"type": "string"}) for field in CUT_SHEET_DEFAULTS},
+    "required": list(CUT_SHEET_DEFAULTS),
+    "additionalProperties": False,
+}
+
+CUT_SHEET_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "cut_sheet_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"items": {"type": "array", "items": _CUT_SHEET_SCHEMA}},
+            "required": ["items"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Recovery format for models/endpoints that reject json_schema; fields are then not guaranteed
+_JSON_OBJECT_RESPONSE_FORMAT: Dict[str, Any] = {"type": "json_object"}
+
+
+def parse_cut_sheet_json(response_text: str, original_moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parse a structured cut sheet response and merge with original moments.
+
+    Cut sheets are matched to moments by position, since we sent them in order.
+    Missing fields are filled from CUT_SHEET_DEFAULTS; moments without a cut
+    sheet (short or unreadable response) get a fallback one.
 
     Args:
-        response_text: Raw response from GPT with cut sheets
+        response_text: JSON response of the form {"items": [cut sheet, ...]}
         original_moments: Original moment dictionaries
 
     Returns:
         Updated moments with editor_cut_sheet data added
     """
-    updated_moments = []
-
-    # Split response into moment blocks (heuristic approach)
-    blocks = re.split(r'\n\s*(?=MOMENT HEADER)', response_text, flags=re.IGNORECASE)
+    try:
+        items = json.loads(response_text).get("items") or []
+    except (ValueError, AttributeError) as e:
+        print(f"[cut_sheets] Could not parse cut sheet JSON, using fallback cut sheets: {e}")
+        items = []
 
-    # Match blocks to original moments (by order, since we sent them in order)
+    updated_moments = []
     for i, moment in enumerate(original_moments):
-        updated_moment = moment.copy()
-
-        # Try to find corresponding cut sheet block
-        if i < len(blocks):
-            cut_sheet = parse_single_cut_sheet_block(blocks[i])
-            if cut_sheet:
-                updated_moment["editor_cut_sheet"] = cut_sheet
-
-        # If no cut sheet found, create a minimal one
-        if "editor_cut_sheet" not in updated_moment:
-            updated_moment["editor_cut_sheet"] = create_fallback_cut_sheet(moment)
-
-        updated_moments.append(updated_moment)
+        item = items[i] if i < len(items) else None
+        if isinstance(item, dict):
+            cut_sheet = {**CUT_SHEET_DEFAULTS, "emphasis_words_caps": [], **item}
+        else:
+            cut_sheet = create_fallback_cut_sheet(moment)
+        updated_moments.append({**moment, "editor_cut_sheet": cut_sheet})
 
     return updated_moments
 
 
-def parse_single_cut_sheet_block(block_text: str) -> Dict[str, Any]:
-    """Parse a single cut sheet block into structured data.
-
-    Args:
-        block_text: Text block containing cut sheet data
-
-    Returns:
-        Cut sheet dictionary
-    """
-    cut_sheet = {
-        "clip_label": "",
-        "in_point": "",
-        "out_point": "",
-        "aspect_ratio": "9:16",
-        "crop_note": "",
-        "opening_hook_subtitle": "",
-        "emphasis_words_caps": [],
-        "pacing_note": "",
-        "b_roll_ideas": "",
-        "text_on_screen_idea": "",
-        "silence_handling": "none",
-        "thumbnail_text": "",
-        "thumbnail_face_cue": "",
-        "platform_priority": "All",
-        "use_persona_caption": ""
-    }
-
-    lines = block_text.split('\n')
-    in_cut_sheet_section = False
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        line_lower = line.lower()
-
-        # Check if we're in the editor cut sheet section
-        if 'editor cut sheet' in line_lower:
-            in_cut_sheet_section = True
-            continue
-
-        if in_cut_sheet_section and '-' in line:
-            # Parse cut sheet fields
-            field_name, field_value = extract_field_value(line)
-
-            if field_name == "clip_label":
-                cut_sheet["clip_label"] = field_value
-            elif field_name == "in_point":
-                cut_sheet["in_point"] = field_value
-            elif field_name == "out_point":
-                cut_sheet["out_point"] = field_value
-            elif field_name == "aspect_ratio":
-                cut_sheet["aspect_ratio"] = field_value
-            elif field_name == "crop_note":
-                cut_sheet["crop_note"] = field_value
-            elif field_name == "opening_hook_subtitle":
-                cut_sheet["opening_hook_subtitle"] = field_value
-            elif field_name == "emphasis_words_caps":
-                # Parse list of words/phrases
-                caps_list = parse_caps_list(field_value)
-                cut_sheet["emphasis_words_caps"] = caps_list
-            elif field_name == "pacing_note":
-                cut_sheet["pacing_note"] = field_value
-            elif field_name == "b_roll_ideas":
-                cut_sheet["b_roll_ideas"] = field_value
-            elif field_name == "text_on_screen_idea":
-                cut_sheet["text_on_screen_idea"] = field_value
-            elif field_name == "silence_handling":
-                cut_sheet["silence_handling"] = field_value
-            elif field_name == "thumbnail_text":
-                cut_sheet["thumbnail_text"] = field_value
-            elif field_name == "thumbnail_face_cue":
-                cut_sheet["thumbnail_face_cue"] = field_value
-            elif field_name == "platform_priority":
-                cut_sheet["platform_priority"] = field_value
-            elif field_name == "use_persona_caption":
-                cut_sheet["use_persona_caption"] = field_value
-
-    return cut_sheet
-
-
-def extract_field_value(line: str) -> tuple[str, str]:
-    """Extract field name and value from a cut sheet line.
-
-    Args:
-        line: Line like "- clip_label: SOME_VALUE"
-
-    Returns:
-        Tuple of (field_name, field_value)
-    """
-    # Remove bullet and split on colon
-    line = re.sub(r'^-\s*', '', line.strip())
-
-    if ':' in line:
-        parts = line.split(':', 1)
-        field_name = parts[0].strip().lower()
-        field_value = parts[1].strip()
-
-        # Clean up field value
-        field_value = re.sub(r'^\[|\]$', '', field_value)  # Remove brackets
-        field_value = field_value.strip('"\'')  # Remove quotes
-
-        return field_name, field_value
-
-    return "", ""
-
-
-def parse_caps_list(caps_text: str) -> List[str]:
-    """Parse emphasis words caps field into list.
-
-    Args:
-        caps_text: Text like "WORD1, PHRASE TWO, WORD3" or "[word1, word2, word3]"
-
-    Returns:
-        List of words/phrases to capitalize
-    """
-    if not caps_text:
-        return []
-
-    # Remove brackets and split on commas
-    caps_text = re.sub(r'[\[\]]', '', caps_text)
-
-    # Split on commas and clean up
-    words = []
-    for word in caps_text.split(','):
-        word = word.strip().strip('"\'')
-        if word:
-            words.append(word)
-
-    return words
-
-
 def create_fallback_cut_sheet(moment: Dict[str, Any]) -> Dict[str, Any]:
     """Create a minimal fallback cut sheet when parsing fails.
 
@@ -298,14 +228,14 @@ def create_fallback_cut_sheet(moment: Dict[str, Any]) -> Dict[str, Any]:
     timestamps = moment.get('timestamps', '')
     start_ts, end_ts = '', ''
     if '–' in timestamps or '—' in timestamps or '-' in timestamps:
-        parts = re.split(r'[–—-]', timestamps)
+        parts = _TS_SPLIT_RE.split(timestamps)
         if len(parts) >= 2:
             start_ts = parts[0].strip()
             end_ts = parts[1].strip()
 
     # Create basic label from energy tag or trigger
     label_base = moment.get('energy_tag', '') or moment.get('viral_trigger', '') or 'MOMENT'
-    clip_label = re.sub(r'[^A-Z0-9]+', '_', label_base.upper()).strip('_')
+    clip_label = _NON_ALNUM_RE.sub('_', label_base.upper()).strip('_')
 
     return {
         "clip_label": clip_label,
@@ -322,14 +252,20 @@ def create_fallback_cut_sheet(moment: Dict[str, Any]) -> Dict[str, Any]:
         "thumbnail_text": clip_label,
         "thumbnail_face_cue": "use strongest expression",
         "platform_priority": "All",
-        "use_persona_caption": moment.get('persona_captions', {}).get('catholic', '')
+        # "catholic" is the last persona in PERSONA_KEYS
+        "use_persona_caption": persona_caption_values(moment.get('persona_captions'))[-1]
     }
 
 
 def generate_cut_sheets(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Generate cut sheets for extracted moments using GPT-5.1.
 
-    Main function that orchestrates the cut sheet generation process.
+    Main function that orchestrates the cut sheet generation process. Moments are
+    split into batches of config.CUT_SHEET_BATCH_SIZE that are sent concurrently
+    and parsed independently, so one bad response only affects its own batch
+    (those moments get fallback cut sheets). Responses are requested as strict
+    JSON schema output; batches whose request fails are retried once in plain
+    JSON mode.
 
     Args:
         moments: List of moment dictionaries from extraction
@@ -338,25 +274,58 @@ def generate_cut_sheets(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         Updated moments with editor_cut_sheet data
 
     Raises:
-        RuntimeError: If LLM call fails
+        RuntimeError: If every LLM call fails
     """
     if not moments:
         return []
 
     try:
-        # Format moments for the prompt
-        formatted_input = format_moments_for_cutsheet_prompt(moments)
+        # Format each batch of moments for the prompt; only this part varies per request
+        batch_size = config.CUT_SHEET_BATCH_SIZE
+        batches = [moments[i:i + batch_size] for i in range(0, len(moments), batch_size)]
+        prompts = [format_moments_for_cutsheet_prompt(batch) for batch in batches]
+
+        # Call GPT-5.1 for all batches concurrently
+        responses = _call_cut_sheet_llm(prompts, CUT_SHEET_RESPONSE_FORMAT)
+
+        # Retry failed batches once without the schema (e.g. model lacks structured output support)
+        failed = [i for i, response in enumerate(responses) if isinstance(response, Exception)]
+        if failed:
+            print(f"[cut_sheets] {len(failed)} batch(es) failed with JSON schema output, retrying in JSON mode")
+            retried = _call_cut_sheet_llm([prompts[i] for i in failed], _JSON_OBJECT_RESPONSE_FORMAT)
+            for i, response in zip(failed, retried):
+                responses[i] = response
+
+        if all(isinstance(response, Exception) for response in responses):
+            raise responses[0]
+
+        # Parse each response and merge with original data
+        updated_moments = []
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                print(f"[cut_sheets] Batch of {len(batch)} moments failed, using fallback cut sheets: {response}")
+                updated_moments.extend(
+                    {**moment, "editor_cut_sheet": create_fallback_cut_sheet(moment)} for moment in batch
+                )
+            else:
+                updated_moments.extend(parse_cut_sheet_json(response, batch))
 
-        # Build full prompt
-        full_prompt = f"{CUT_SHEET_PROMPT}\n\n{formatted_input}"
+        return updated_moments
 
-        # Call GPT-5.1
-        response = call_llm(full_prompt)
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate cut sheets: {e}")
 
-        # Parse response and merge with original data
-        updated_moments = parse_cut_sheet_response(response, moments)
 
-        return updated_moments
+def _call_cut_sheet_llm(prompts: List[str], response_format: Dict[str, Any]) -> List[Any]:
+    """Send cut sheet prompts concurrently, with the static prompt as system message.
 
-    except Exception as e:
-        raise RuntimeError(f"Failed to generate cut sheets: {e}")
\ No newline at end of file
+    Temperature 0 keeps output deterministic so repeated batches hit the response cache.
+    """
+    return call_llm_many(
+        prompts,
+        system_prompt=CUT_SHEET_PROMPT,
+        temperature=0,
+        max_concurrency=config.MAX_PARALLEL_CUT_SHEET_CALLS,
+        cache_version=CUT_SHEET_PROMPT_VERSION,
+        response_format=response_format,
+    )
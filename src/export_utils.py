@@ -6,7 +6,31 @@ import csv
 import io
 import json
 import re
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Iterator, TextIO
+
+from src.extraction import persona_caption_values
+
+try:
+    import orjson  # Optional: faster JSON encoding
+except ImportError:
+    orjson = None
+
+
+# SRT cue timing line, e.g. "00:01:02,500 --> 00:01:05,000"
+_SRT_TS_RE = re.compile(
+    r"(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})"
+)
+
+# Moment timestamp range, e.g. "00:04.23-00:21.90" or "00:04.23–00:21.90"
+_TS_RANGE_RE = re.compile(r"([0-9:.]+)[\-–]([0-9:.]+)")
+
+
+def _dumps_indented(data: Any) -> str:
+    """Serialize to 2-space indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False)
 
 
 # -------------------------------
@@ -24,31 +48,18 @@ def srt_to_ffmpeg_json(srt_text: str) -> str:
         ...
     ]
     """
-    ts_re = re.compile(
-        r"(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})"
-    )
-
-    clips: List[Dict[str, Any]] = []
-    idx = 0
-
-    for line in srt_text.splitlines():
-        m = ts_re.search(line)
-        if not m:
-            continue
-
-        idx += 1
-        sh, sm, ss, sms, eh, em, es, ems = m.groups()
-        start = f"{sh}:{sm}:{ss}.{sms}"
-        end = f"{eh}:{em}:{es}.{ems}"
-
-        clips.append({
+    # One pass over the whole buffer; cue numbers and text lines never match.
+    clips: List[Dict[str, Any]] = [
+        {
             "index": idx,
             "label": f"SRT_CLIP_{idx}",
-            "start": start,
-            "end": end,
-        })
+            "start": f"{m[1]}:{m[2]}:{m[3]}.{m[4]}",
+            "end": f"{m[5]}:{m[6]}:{m[7]}.{m[8]}",
+        }
+        for idx, m in enumerate(_SRT_TS_RE.finditer(srt_text), 1)
+    ]
 
-    return json.dumps(clips, indent=2)
+    return _dumps_indented(clips)
 
 
 # -------------------------------
@@ -56,48 +67,37 @@ def srt_to_ffmpeg_json(srt_text: str) -> str:
 # -------------------------------
 
 
-def to_ffmpeg_json(moments_with_cuts: List[Dict[str, Any]]) -> str:
-    """Export moments as ffmpeg-friendly JSON for auto-clipping."""
-
-    def normalize_timestamp(ts: str) -> str:
-        # Accepts MM:SS.xx or HH:MM:SS.xx → return HH:MM:SS.xx
-        parts = ts.strip().split(":")
+def _ts_to_ms(ts: str) -> int:
+    """Convert an MM:SS.xx or HH:MM:SS.xx timestamp to integer milliseconds (0 if invalid)."""
+    parts = ts.strip().split(":")
+    try:
         if len(parts) == 2:
             h = 0
             m, s = parts
         elif len(parts) == 3:
             h, m, s = parts
         else:
-            return ts
-        try:
-            h = int(h)
-            m = int(m)
-            s = float(s)
-        except Exception:
-            return ts
-        return f"{h:02d}:{m:02d}:{s:05.2f}"
-
-    def timestamp_to_seconds(ts: str) -> float:
-        """Convert timestamp string to seconds."""
-        parts = ts.strip().split(":")
-        try:
-            if len(parts) == 2:
-                m, s = parts
-                return int(m) * 60 + float(s)
-            elif len(parts) == 3:
-                h, m, s = parts
-                return int(h) * 3600 + int(m) * 60 + float(s)
-        except Exception:
-            pass
-        return 0.0
-
-    def seconds_to_timestamp(secs: float) -> str:
-        """Convert seconds to HH:MM:SS.xx format."""
-        h = int(secs // 3600)
-        m = int((secs % 3600) // 60)
-        s = secs % 60
-        return f"{h:02d}:{m:02d}:{s:05.2f}"
+            return 0
+        return (int(h) * 3600 + int(m) * 60) * 1000 + round(float(s) * 1000)
+    except ValueError:
+        return 0
+
 
+def _ms_to_ts(ms: int) -> str:
+    """Convert integer milliseconds to an HH:MM:SS.xx timestamp."""
+    cs = (ms + 5) // 10  # round to centiseconds
+    h, cs = divmod(cs, 360_000)
+    m, cs = divmod(cs, 6_000)
+    s, cs = divmod(cs, 100)
+    return f"{h:02d}:{m:02d}:{s:02d}.{cs:02d}"
+
+
+def to_ffmpeg_json(moments_with_cuts: List[Dict[str, Any]]) -> str:
+    """Export moments as ffmpeg-friendly JSON for auto-clipping.
+
+    Times are computed in integer milliseconds so padding doesn't accumulate
+    floating-point error.
+    """
     ffmpeg_clips = []
     for idx, moment in enumerate(moments_with_cuts, 1):
         cut_sheet = moment.get("editor_cut_sheet") or {}
@@ -111,45 +111,41 @@ def to_ffmpeg_json(moments_with_cuts: List[Dict[str, Any]]) -> str:
         else:
             # Fall back to timestamps field
             timestamps = (moment.get("timestamps") or "").strip()
-            match = re.match(r"([0-9:.]+)[\-–]([0-9:.]+)", timestamps)
+            match = _TS_RANGE_RE.match(timestamps)
             if not match:
                 continue
             start_raw, _ = match.groups()
 
-        # Convert start to seconds
-        start_sec = timestamp_to_seconds(normalize_timestamp(start_raw))
+        # Convert start to milliseconds
+        start_ms = _ts_to_ms(start_raw)
 
-        # PRIMARY: Calculate end_sec = start + duration + 2.0 (follows QUOTE length, not token timestamps)
+        # PRIMARY: Calculate end = start + duration + buffer (follows QUOTE length, not token timestamps)
         clip_duration = moment.get("clip_duration_seconds")
         if not clip_duration or clip_duration <= 0:
             # If no duration, must fall back to timestamps/out_point
             out_point = cut_sheet.get("out_point", "").strip()
             if out_point:
-                end_sec = timestamp_to_seconds(normalize_timestamp(out_point))
+                end_ms = _ts_to_ms(out_point)
             else:
                 timestamps = (moment.get("timestamps") or "").strip()
-                match = re.match(r"([0-9:.]+)[\-–]([0-9:.]+)", timestamps)
+                match = _TS_RANGE_RE.match(timestamps)
                 if not match:
                     continue
                 _, end_raw = match.groups()
-                end_sec = timestamp_to_seconds(normalize_timestamp(end_raw))
+                end_ms = _ts_to_ms(end_raw)
         else:
             # Use duration + 4.0 second buffer (follows quote length, runs long not short)
             # IGNORE timestamps/out_point - they are unreliable and cause clips to end too early
-            end_sec = start_sec + clip_duration + 4.0
-
-        # Convert back to timestamp strings
-        start = seconds_to_timestamp(start_sec)
-        end = seconds_to_timestamp(end_sec)
+            end_ms = start_ms + round(clip_duration * 1000) + 4000
 
         ffmpeg_clips.append({
             "index": idx,
             "label": label,
-            "start": start,
-            "end": end,
+            "start": _ms_to_ts(start_ms),
+            "end": _ms_to_ts(end_ms),
         })
 
-    return json.dumps(ffmpeg_clips, indent=2)
+    return _dumps_indented(ffmpeg_clips)
 
 
 # -------------------------------
@@ -157,66 +153,73 @@ def to_ffmpeg_json(moments_with_cuts: List[Dict[str, Any]]) -> str:
 # -------------------------------
 
 
-def to_csv(moments_with_cuts: List[Dict[str, Any]]) -> str:
-    """Convert moments with cut sheets to CSV format."""
-    if not moments_with_cuts:
-        return ""
+CSV_FIELDNAMES = (
+    "clip_id", "clip_label", "timestamps", "quote", "clip_duration_seconds",
+    "viral_trigger", "why_it_hits", "energy_tag", "flags",
+    "historian_caption", "thomist_caption", "ex_protestant_caption",
+    "meme_catholic_caption", "old_world_catholic_caption", "catholic_caption",
+    "in_point", "out_point", "aspect_ratio", "crop_note",
+    "opening_hook_subtitle", "emphasis_words_caps", "pacing_note",
+    "b_roll_ideas", "text_on_screen_idea", "silence_handling",
+    "thumbnail_text", "thumbnail_face_cue", "platform_priority",
+    "use_persona_caption",
+)
 
-    output = io.StringIO()
 
-    fieldnames = [
-        "clip_id", "clip_label", "timestamps", "quote", "clip_duration_seconds",
-        "viral_trigger", "why_it_hits", "energy_tag", "flags",
-        "historian_caption", "thomist_caption", "ex_protestant_caption",
-        "meme_catholic_caption", "old_world_catholic_caption", "catholic_caption",
-        "in_point", "out_point", "aspect_ratio", "crop_note",
-        "opening_hook_subtitle", "emphasis_words_caps", "pacing_note",
-        "b_roll_ideas", "text_on_screen_idea", "silence_handling",
-        "thumbnail_text", "thumbnail_face_cue", "platform_priority",
-        "use_persona_caption",
-    ]
+def _csv_rows(moments_with_cuts: List[Dict[str, Any]]) -> Iterator[tuple]:
+    """Yield one CSV row per moment, in CSV_FIELDNAMES column order."""
+    for moment in moments_with_cuts:
+        get = moment.get
+        cut_get = (get("editor_cut_sheet", {}) or {}).get
+
+        yield (
+            get("id", ""),
+            cut_get("clip_label", ""),
+            get("timestamps", ""),
+            get("quote", ""),
+            get("clip_duration_seconds", ""),
+            get("viral_trigger", ""),
+            get("why_it_hits", ""),
+            get("energy_tag", ""),
+            "; ".join(get("flags", [])),
+            *persona_caption_values(get("persona_captions")),
+            cut_get("in_point", ""),
+            cut_get("out_point", ""),
+            cut_get("aspect_ratio", ""),
+            cut_get("crop_note", ""),
+            cut_get("opening_hook_subtitle", ""),
+            "; ".join(cut_get("emphasis_words_caps", [])),
+            cut_get("pacing_note", ""),
+            cut_get("b_roll_ideas", ""),
+            cut_get("text_on_screen_idea", ""),
+            cut_get("silence_handling", ""),
+            cut_get("thumbnail_text", ""),
+            cut_get("thumbnail_face_cue", ""),
+            cut_get("platform_priority", ""),
+            cut_get("use_persona_caption", ""),
+        )
 
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
 
-    for moment in moments_with_cuts:
-        cut = moment.get("editor_cut_sheet", {}) or {}
-        personas = moment.get("persona_captions", {}) or {}
-
-        row = {
-            "clip_id": moment.get("id", ""),
-            "clip_label": cut.get("clip_label", ""),
-            "timestamps": moment.get("timestamps", ""),
-            "quote": moment.get("quote", ""),
-            "clip_duration_seconds": moment.get("clip_duration_seconds", ""),
-            "viral_trigger": moment.get("viral_trigger", ""),
-            "why_it_hits": moment.get("why_it_hits", ""),
-            "energy_tag": moment.get("energy_tag", ""),
-            "flags": "; ".join(moment.get("flags", [])),
-            "historian_caption": personas.get("historian", ""),
-            "thomist_caption": personas.get("thomist", ""),
-            "ex_protestant_caption": personas.get("ex_protestant", ""),
-            "meme_catholic_caption": personas.get("meme_catholic", ""),
-            "old_world_catholic_caption": personas.get("old_world_catholic", ""),
-            "catholic_caption": personas.get("catholic", ""),
-            "in_point": cut.get("in_point", ""),
-            "out_point": cut.get("out_point", ""),
-            "aspect_ratio": cut.get("aspect_ratio", ""),
-            "crop_note": cut.get("crop_note", ""),
-            "opening_hook_subtitle": cut.get("opening_hook_subtitle", ""),
-            "emphasis_words_caps": "; ".join(cut.get("emphasis_words_caps", [])),
-            "pacing_note": cut.get("pacing_note", ""),
-            "b_roll_ideas": cut.get("b_roll_ideas", ""),
-            "text_on_screen_idea": cut.get("text_on_screen_idea", ""),
-            "silence_handling": cut.get("silence_handling", ""),
-            "thumbnail_text": cut.get("thumbnail_text", ""),
-            "thumbnail_face_cue": cut.get("thumbnail_face_cue", ""),
-            "platform_priority": cut.get("platform_priority", ""),
-            "use_persona_caption": cut.get("use_persona_caption", ""),
-        }
+def to_csv_stream(moments_with_cuts: List[Dict[str, Any]], fp: TextIO) -> None:
+    """Write moments with cut sheets as CSV directly to an open text file.
 
-        writer.writerow(row)
+    Open the file with newline="" as the csv module expects.
+    """
+    if not moments_with_cuts:
+        return
+
+    writer = csv.writer(fp)
+    writer.writerow(CSV_FIELDNAMES)
+    writer.writerows(_csv_rows(moments_with_cuts))
 
+
+def to_csv(moments_with_cuts: List[Dict[str, Any]]) -> str:
+    """Convert moments with cut sheets to CSV format."""
+    if not moments_with_cuts:
+        return ""
+
+    output = io.StringIO()
+    to_csv_stream(moments_with_cuts, output)
     return output.getvalue()
 
 
@@ -225,78 +228,94 @@ def to_csv(moments_with_cuts: List[Dict[str, Any]]) -> str:
 # -------------------------------
 
 
-def to_markdown(moments_with_cuts: List[Dict[str, Any]]) -> str:
-    """Convert moments with cut sheets to Markdown format."""
+# Persona caption keys and their display names, in output order (same order as PERSONA_KEYS)
+PERSONA_LABELS = (
+    ("historian", "Historian"),
+    ("thomist", "Thomist"),
+    ("ex_protestant", "Ex-Protestant"),
+    ("meme_catholic", "Meme Catholic"),
+    ("old_world_catholic", "Old World Catholic"),
+    ("catholic", "Catholic"),
+)
+
+
+def _markdown_lines(moments_with_cuts: List[Dict[str, Any]]) -> Iterator[str]:
+    """Yield the Markdown export line by line (without newlines)."""
     if not moments_with_cuts:
-        return "# Viral Clips\n\nNo clips found."
+        yield "# Viral Clips\n\nNo clips found."
+        return
 
-    lines = ["# Viral Clips", "", f"Generated {len(moments_with_cuts)} clips for editing.", ""]
+    yield from ("# Viral Clips", "", f"Generated {len(moments_with_cuts)} clips for editing.", "")
 
     for i, moment in enumerate(moments_with_cuts, 1):
-        cut = moment.get("editor_cut_sheet", {}) or {}
-        personas = moment.get("persona_captions", {}) or {}
-
-        clip_label = cut.get("clip_label", f"CLIP_{i}")
-        lines.append(f"## Clip {i} – {clip_label}")
-        lines.append("")
-        lines.append(f"- **Timestamps:** {moment.get('timestamps', 'N/A')}")
-        lines.append(f"- **Duration:** {moment.get('clip_duration_seconds', 'N/A')} seconds")
-        lines.append(f"- **Trigger:** {moment.get('viral_trigger', 'N/A')}")
-        lines.append(f"- **Energy:** {moment.get('energy_tag', 'N/A')}")
-        flags = moment.get("flags", [])
+        get = moment.get
+        cut_get = (get("editor_cut_sheet", {}) or {}).get
+
+        clip_label = cut_get("clip_label", f"CLIP_{i}")
+        yield f"## Clip {i} – {clip_label}"
+        yield ""
+        yield f"- **Timestamps:** {get('timestamps', 'N/A')}"
+        yield f"- **Duration:** {get('clip_duration_seconds', 'N/A')} seconds"
+        yield f"- **Trigger:** {get('viral_trigger', 'N/A')}"
+        yield f"- **Energy:** {get('energy_tag', 'N/A')}"
+        flags = get("flags", [])
         if flags:
-            lines.append(f"- **Flags:** {', '.join(flags)}")
-        lines.append("")
+            yield f"- **Flags:** {', '.join(flags)}"
+        yield ""
 
-        quote = moment.get("quote", "")
+        quote = get("quote", "")
         if quote:
-            lines.append("**Quote:**")
+            yield "**Quote:**"
             for l in quote.splitlines():
-                lines.append(f"> {l}")
-            lines.append("")
+                yield f"> {l}"
+            yield ""
 
-        why = moment.get("why_it_hits", "")
+        why = get("why_it_hits", "")
         if why:
-            lines.append("**Why it hits:**")
+            yield "**Why it hits:**"
             for l in why.splitlines():
-                lines.append(f"> {l}")
-            lines.append("")
-
-        lines.append("**Persona Captions:**")
-        for key, name in [
-            ("historian", "Historian"),
-            ("thomist", "Thomist"),
-            ("ex_protestant", "Ex-Protestant"),
-            ("meme_catholic", "Meme Catholic"),
-            ("old_world_catholic", "Old World Catholic"),
-            ("catholic", "Catholic"),
-        ]:
-            lines.append(f"- {name}: {personas.get(key, '')}")
-        lines.append("")
-
-        lines.append("**Editor Cut Sheet:**")
-        lines.append(f"- **In Point:** {cut.get('in_point', 'N/A')}")
-        lines.append(f"- **Out Point:** {cut.get('out_point', 'N/A')}")
-        lines.append(f"- **Aspect Ratio:** {cut.get('aspect_ratio', '9:16')}")
-        lines.append(f"- **Crop Note:** {cut.get('crop_note', 'N/A')}")
-        lines.append(f"- **Opening Hook Subtitle:** {cut.get('opening_hook_subtitle', 'N/A')}")
-        emphasis_words = cut.get("emphasis_words_caps", [])
-        lines.append(
-            f"- **Emphasis Words (ALL CAPS):** {', '.join(emphasis_words) if emphasis_words else 'None specified'}"
-        )
-        lines.append(f"- **Pacing Note:** {cut.get('pacing_note', 'N/A')}")
-        lines.append(f"- **B-Roll Ideas:** {cut.get('b_roll_ideas', 'none')}")
-        lines.append(f"- **Text on Screen Idea:** {cut.get('text_on_screen_idea', 'none')}")
-        lines.append(f"- **Silence Handling:** {cut.get('silence_handling', 'none')}")
-        lines.append(f"- **Thumbnail Text:** {cut.get('thumbnail_text', 'N/A')}")
-        lines.append(f"- **Thumbnail Face Cue:** {cut.get('thumbnail_face_cue', 'N/A')}")
-        lines.append(f"- **Platform Priority:** {cut.get('platform_priority', 'All')}")
-        lines.append(f"- **Use Persona Caption:** {cut.get('use_persona_caption', 'N/A')}")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
+                yield f"> {l}"
+            yield ""
+
+        yield "**Persona Captions:**"
+        for (_, name), caption in zip(PERSONA_LABELS, persona_caption_values(get("persona_captions"))):
+            yield f"- {name}: {caption}"
+        yield ""
+
+        yield "**Editor Cut Sheet:**"
+        yield f"- **In Point:** {cut_get('in_point', 'N/A')}"
+        yield f"- **Out Point:** {cut_get('out_point', 'N/A')}"
+        yield f"- **Aspect Ratio:** {cut_get('aspect_ratio', '9:16')}"
+        yield f"- **Crop Note:** {cut_get('crop_note', 'N/A')}"
+        yield f"- **Opening Hook Subtitle:** {cut_get('opening_hook_subtitle', 'N/A')}"
+        emphasis_words = cut_get("emphasis_words_caps", [])
+        yield f"- **Emphasis Words (ALL CAPS):** {', '.join(emphasis_words) if emphasis_words else 'None specified'}"
+        yield f"- **Pacing Note:** {cut_get('pacing_note', 'N/A')}"
+        yield f"- **B-Roll Ideas:** {cut_get('b_roll_ideas', 'none')}"
+        yield f"- **Text on Screen Idea:** {cut_get('text_on_screen_idea', 'none')}"
+        yield f"- **Silence Handling:** {cut_get('silence_handling', 'none')}"
+        yield f"- **Thumbnail Text:** {cut_get('thumbnail_text', 'N/A')}"
+        yield f"- **Thumbnail Face Cue:** {cut_get('thumbnail_face_cue', 'N/A')}"
+        yield f"- **Platform Priority:** {cut_get('platform_priority', 'All')}"
+        yield f"- **Use Persona Caption:** {cut_get('use_persona_caption', 'N/A')}"
+        yield ""
+        yield "---"
+        yield ""
+
+
+def to_markdown_stream(moments_with_cuts: List[Dict[str, Any]], fp: TextIO) -> None:
+    """Write moments with cut sheets as Markdown directly to an open text file."""
+    write = fp.write
+    lines = _markdown_lines(moments_with_cuts)
+    write(next(lines))
+    for line in lines:
+        write("\n")
+        write(line)
 
-    return "\n".join(lines)
+
+def to_markdown(moments_with_cuts: List[Dict[str, Any]]) -> str:
+    """Convert moments with cut sheets to Markdown format."""
+    return "\n".join(_markdown_lines(moments_with_cuts))
 
 
 # -------------------------------
@@ -310,19 +329,19 @@ def format_clip_summary(moments_with_cuts: List[Dict[str, Any]]) -> str:
         return "No clips generated."
 
     total = len(moments_with_cuts)
-    triggers: Dict[str, int] = {}
+    triggers: Counter = Counter()
     flagged = 0
 
     for m in moments_with_cuts:
-        t = m.get("viral_trigger", "Unknown")
-        triggers[t] = triggers.get(t, 0) + 1
+        triggers[m.get("viral_trigger", "Unknown")] += 1
         if m.get("flags"):
             flagged += 1
 
     parts = [f"Generated **{total}** viral clips"]
 
     if triggers:
-        parts.append("Triggers: " + ", ".join(f"{count} {name}" for name, count in triggers.items()))
+        # Most common first; ties keep first-seen order
+        parts.append("Triggers: " + ", ".join(f"{count} {name}" for name, count in triggers.most_common()))
 
     if flagged:
         parts.append(f"{flagged} clips have special flags")
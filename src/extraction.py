@@ -1,126 +1,342 @@
-from typing import List, Dict, Any, Optional
-import uuid
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Iterator, Optional
+import itertools
+import json
+import re
+import secrets
+from operator import itemgetter
 
+try:
+    from pydantic_core import from_json  # Optional: jiter-based parsing, can read truncated JSON
+except ImportError:
+    from_json = None
 
-def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
-    """Parse GPT's JSON response into structured moment data.
+try:
+    import orjson  # Optional: faster parsing of model responses
+except ImportError:
+    orjson = None
 
-    This is intentionally defensive because models sometimes:
-    - wrap JSON in prose,
-    - wrap JSON in markdown fences,
-    - return a top-level list instead of {"moments": [...]},
-    - or include extra keys around the "moments" array.
+
+# Possible start of an embedded JSON object / array
+_JSON_START_RE = re.compile(r"[{\[]")
+_JSON_DECODER = json.JSONDecoder()
+
+# Start of the moments array in a streamed {"moments": [...]} response
+_MOMENTS_ARRAY_RE = re.compile(r'"moments"\s*:\s*\[')
+# Separators between array entries
+_ENTRY_SEP_RE = re.compile(r"[\s,]*")
+
+# Moment IDs: a random per-process prefix plus a counter, so IDs stay 8 hex chars
+# without a urandom read per moment. next() on a count is atomic, so chunk threads can share it.
+_ID_PREFIX = secrets.token_hex(2)
+_ID_COUNTER = itertools.count()
+
+PERSONA_KEYS = ("historian", "thomist", "ex_protestant", "meme_catholic", "old_world_catholic", "catholic")
+
+# Defaults for optional moment fields so downstream UI doesn't explode.
+# Mutable defaults (flags, persona_captions) are created per moment.
+_MOMENT_DEFAULTS: Dict[str, Any] = {
+    "viral_trigger": "",
+    "why_it_hits": "",
+    "energy_tag": "",
+}
+_PERSONA_DEFAULTS: Dict[str, str] = dict.fromkeys(PERSONA_KEYS, "")
+_PERSONA_GET = itemgetter(*PERSONA_KEYS)
+
+# Typical speech rate, used as a floor for the LLM's clip duration estimate
+WORDS_PER_SECOND = 2.6
+
+
+def _safe_int(value: Any) -> int:
+    """Coerce an LLM-supplied number to int, treating missing or malformed values as 0."""
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def persona_caption_values(captions: Optional[Dict[str, str]]) -> tuple:
+    """Return a moment's persona captions in PERSONA_KEYS order, "" for any missing."""
+    return _PERSONA_GET({**_PERSONA_DEFAULTS, **(captions or {})})
+
+
+def _load_json(text: str, allow_partial: bool = False) -> Optional[Any]:
+    """Parse JSON text with the fastest available parser, returning None if invalid.
+
+    With allow_partial, a truncated document (e.g. a response cut off at the
+    token limit) yields whatever complete values it holds; this needs
+    pydantic_core and returns None without it.
     """
-    import json
-    import re
-
-    def strip_code_fences(text: str) -> str:
-        t = text.strip()
-
-        # Strip ```json ... ``` or ``` ... ```
-        if t.startswith("```"):
-            # remove leading ```... first line
-            # e.g. ```json\n{...}
-            first_newline = t.find("\n")
-            if first_newline != -1:
-                t = t[first_newline + 1 :]
-            # remove trailing ```
-            if t.endswith("```"):
-                t = t[:-3]
-        return t.strip()
-
-    def try_load_json(candidate: str) -> Optional[Any]:
+    try:
+        if from_json is not None:
+            return from_json(text, allow_partial=allow_partial)
+        if allow_partial:
+            return None
+        return orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:  # also covers json/orjson JSONDecodeError
+        return None
+
+
+def _scan_for_json(text: str) -> Optional[Any]:
+    """Return the first JSON object or array embedded in text, or None.
+
+    Tries raw_decode at each "{" or "[" in turn, so the text is scanned forward
+    once instead of regex-matching the widest brace-delimited span.
+    """
+    for match in _JSON_START_RE.finditer(text):
         try:
-            return json.loads(candidate)
+            data, _ = _JSON_DECODER.raw_decode(text, match.start())
         except json.JSONDecodeError:
-            return None
+            continue
+        return data
+    return None
+
+
+def _strip_code_fences(text: str) -> str:
+    """Strip a surrounding ```json ... ``` or ``` ... ``` wrapper, if any."""
+    t = text.strip()
+
+    if t.startswith("```"):
+        # remove leading ```... first line
+        # e.g. ```json\n{...}
+        first_newline = t.find("\n")
+        if first_newline != -1:
+            t = t[first_newline + 1 :]
+        # remove trailing ```
+        if t.endswith("```"):
+            t = t[:-3]
+    return t.strip()
+
 
+def _raw_moment_list(response_text: str) -> Optional[List[Any]]:
+    """Extract the list of raw moment entries from an LLM response.
+
+    Returns:
+        The unvalidated moment entries, or None if no usable JSON was found
+    """
     # 1) Clean obvious markdown wrappers
-    clean_response = strip_code_fences(response_text)
+    clean_response = _strip_code_fences(response_text)
 
     # 2) First attempt: direct parse of the whole thing
-    data = try_load_json(clean_response)
+    data = _load_json(clean_response)
 
-    # 3) If that fails, try to extract the biggest JSON-looking block
-    if data is None:
-        # Try object first
-        obj_match = re.search(r"\{[\s\S]*\}", clean_response)
-        list_match = re.search(r"\[[\s\S]*\]", clean_response)
+    # 3) Bare JSON that fails to parse is usually truncated; keep its complete moments
+    if data is None and clean_response[:1] in ("{", "["):
+        data = _load_json(clean_response, allow_partial=True)
 
-        candidate = None
-        if obj_match:
-            candidate = obj_match.group(0)
-        elif list_match:
-            candidate = list_match.group(0)
-
-        if candidate:
-            data = try_load_json(candidate)
+    # 4) If that fails, pull out the first JSON value embedded in the text
+    if data is None:
+        data = _scan_for_json(clean_response)
 
     if data is None:
         # Still nothing usable
         print("JSON Parse Error: could not parse LLM response as JSON.")
         print(f"Raw response (truncated): {response_text[:500]}...")
-        return []
+        return None
 
-    # 4) Normalize to a list of moments
+    # 5) Normalize to a list of moments
     if isinstance(data, list):
         # Model returned a bare list of moment objects
-        moments = data
-    elif isinstance(data, dict):
+        return data
+    if isinstance(data, dict):
         # Preferred format: {"moments": [...]}
         moments = data.get("moments", [])
         # Fallback: if "moments" missing but data looks like a single moment
         if not moments and ("quote" in data or "timestamps" in data):
             moments = [data]
-    else:
-        print(f"Unexpected JSON root type: {type(data)}")
+        return moments
+
+    print(f"Unexpected JSON root type: {type(data)}")
+    return None
+
+
+def _normalize_moment(moment: Any, i: int) -> Optional[Dict[str, Any]]:
+    """Validate and enrich one raw moment entry (0-based index i), or return None to skip it."""
+    if not isinstance(moment, dict):
+        print(f"Warning: Skipping non-dict moment at index {i}")
+        return None
+
+    # Ensure required fields exist
+    # We require at least a quote. If timestamps are missing, keep the moment
+    # but set an empty timestamps string so downstream code can still operate
+    if not moment.get("quote"):
+        print(f"Warning: Skipping incomplete moment {i+1} (missing quote)")
+        return None
+    if not moment.get("timestamps"):
+        print(f"Warning: Moment {i+1} missing timestamps; including with empty timestamps")
+        moment.setdefault("timestamps", "")
+    # Recalculate clip_duration_seconds based on word count (more reliable than token timestamps)
+    # Use the LLM's estimate as a baseline, but ensure it's at least word_count / WORDS_PER_SECOND
+    moment["clip_duration_seconds"] = max(
+        _safe_int(moment.get("clip_duration_seconds")),
+        int(len(moment["quote"].split()) / WORDS_PER_SECOND),
+    )
+
+    # Add unique ID
+    moment["id"] = f"{_ID_PREFIX}{next(_ID_COUNTER):04x}"
+
+    # Fill optional fields in one merge; values from the model win over defaults
+    captions = moment.get("persona_captions")
+    moment = {**_MOMENT_DEFAULTS, "flags": [], **moment}
+    moment["persona_captions"] = {**_PERSONA_DEFAULTS, **(captions if isinstance(captions, dict) else {})}
+    return moment
+
+
+def parse_moment_response(response_text: str) -> List[Dict[str, Any]]:
+    """Parse GPT's JSON response into structured moment data.
+
+    This is intentionally defensive because models sometimes:
+    - wrap JSON in prose,
+    - wrap JSON in markdown fences,
+    - return a top-level list instead of {"moments": [...]},
+    - or include extra keys around the "moments" array.
+    """
+    moments = _raw_moment_list(response_text)
+    if moments is None:
         return []
 
-    # 5) Validate and enrich each moment
+    # 6) Validate and enrich each moment
+    return normalize_moments(moments)
+
+
+def normalize_moments(raw_moments: List[Any]) -> List[Dict[str, Any]]:
+    """Validate and enrich already-decoded moment entries, dropping unusable ones."""
     processed_moments = []
-    for i, moment in enumerate(moments):
-        if not isinstance(moment, dict):
-            print(f"Warning: Skipping non-dict moment at index {i}")
-            continue
+    for i, raw in enumerate(raw_moments):
+        moment = _normalize_moment(raw, i)
+        if moment is not None:
+            processed_moments.append(moment)
+    return processed_moments
+
+
+def parse_multi_chunk_response(response_text: str) -> Dict[int, List[Dict[str, Any]]]:
+    """Parse a response covering several chunks into moments per chunk.
+
+    Expects {"chunks": [{"chunk_index": i, "moments": [...]}, ...]}; entries
+    without a usable chunk_index are skipped.
+
+    Returns:
+        Mapping of chunk index to its parsed moments
+    """
+    clean_response = _strip_code_fences(response_text)
+    data = _load_json(clean_response)
+    if data is None:
+        data = _scan_for_json(clean_response)
 
-        # Add unique ID
-        moment["id"] = str(uuid.uuid4())[:8]
+    entries = data.get("chunks") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        print("JSON Parse Error: could not find per-chunk results in LLM response.")
+        print(f"Raw response (truncated): {response_text[:500]}...")
+        return {}
 
-        # Ensure required fields exist
-        # We require at least a quote. If timestamps are missing, keep the moment
-        # but set an empty timestamps string so downstream code can still operate
-        if not moment.get("quote"):
-            print(f"Warning: Skipping incomplete moment {i+1} (missing quote)")
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
             continue
-        if not moment.get("timestamps"):
-            print(f"Warning: Moment {i+1} missing timestamps; including with empty timestamps")
-            moment.setdefault("timestamps", "")
-        # Recalculate clip_duration_seconds based on word count (more reliable than token timestamps)
-        quote = moment.get("quote", "")
-        word_count = len(quote.split()) if quote else 0
-
-        # Use words-per-second rule: typical speech is ~2.6 words/second
-        # Use the LLM's estimate as a baseline, but ensure it's at least word_count / 2.6
-        llm_duration = moment.get("clip_duration_seconds", 0)
-        try:
-            llm_duration = int(llm_duration) if llm_duration else 0
-        except Exception:
-            llm_duration = 0
+        idx = _safe_int(entry.get("chunk_index"))
+        if idx > 0:
+            results.setdefault(idx, []).extend(normalize_moments(entry.get("moments") or []))
+    return results
+
+
+def _normalize_from(raw_entries: List[Any], start: int, offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """Normalize raw_entries[start:], skipping entries that are not valid moments.
+
+    `offset` is added to each entry's position, for entries that continue an earlier list.
+    """
+    for i in range(start, len(raw_entries)):
+        moment = _normalize_moment(raw_entries[i], offset + i)
+        if moment is not None:
+            yield moment
+
+
+class _MomentArrayScanner:
+    """Pull complete moment objects out of a streamed response as they close.
 
-        word_based_duration = int(word_count / 2.6) if word_count > 0 else 0
+    Only the text after the last complete entry is kept and re-read, and a
+    decode is attempted only once a closing brace has arrived, so each byte
+    of the response is parsed a bounded number of times. Scanning stops at
+    the end of the array or at anything unexpected; whatever is left is
+    handled by the full parse at the end of the stream.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""  # text not yet consumed
+        self._started = False  # seen the first non-whitespace text
+        self._in_array = False
+        self._done = False
+        self._brace_seen = False
+
+    def feed(self, piece: str) -> List[Any]:
+        """Add a text fragment and return the raw entries completed by it."""
+        if self._done:
+            return []
+        # Look a little before the new text, in case the array opener was split across fragments
+        search_from = max(0, len(self._buf) - 16)
+        self._buf += piece
+        self._brace_seen = self._brace_seen or "}" in piece
+
+        if not self._in_array:
+            if not self._started and self._buf.strip():
+                self._started = True
+                if self._buf.lstrip()[0] == "[":
+                    # Model returned a bare list of moment objects
+                    self._buf = self._buf.lstrip()[1:]
+                    self._in_array = True
+            if not self._in_array:
+                match = _MOMENTS_ARRAY_RE.search(self._buf, search_from)
+                if not match:
+                    return []
+                self._buf = self._buf[match.end():]
+                self._in_array = True
+
+        if not self._brace_seen:
+            return []
+        self._brace_seen = False
 
-        # Use the maximum of LLM estimate and word-based calculation
-        moment["clip_duration_seconds"] = max(llm_duration, word_based_duration)
+        entries: List[Any] = []
+        buf = self._buf
+        pos = 0
+        while True:
+            pos = _ENTRY_SEP_RE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] != "{":
+                # End of the array (or something unexpected)
+                self._done = True
+                break
+            try:
+                entry, pos = _JSON_DECODER.raw_decode(buf, pos)
+            except ValueError:
+                break  # entry still incomplete
+            entries.append(entry)
+        self._buf = buf[pos:]
+        return entries
 
-        # Ensure optional structures exist so downstream UI doesn't explode
-        moment.setdefault("viral_trigger", "")
-        moment.setdefault("why_it_hits", "")
-        moment.setdefault("energy_tag", "")
-        moment.setdefault("flags", [])
-        moment.setdefault("persona_captions", {})
-        for key in ["historian", "thomist", "ex_protestant", "meme_catholic", "old_world_catholic", "catholic"]:
-            moment["persona_captions"].setdefault(key, "")
 
-        processed_moments.append(moment)
+async def aiter_moment_response(text_chunks: AsyncIterable[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Parse a streamed LLM response, yielding each moment as soon as it is complete.
+
+    Entries of the moments array are decoded as they close (see
+    _MomentArrayScanner). Whatever remains (everything, if the response is
+    not a plain JSON object or list) is parsed like parse_moment_response
+    once the stream ends.
+
+    Args:
+        text_chunks: Response text fragments in arrival order
+
+    Yields:
+        Moment dictionaries, as parse_moment_response would return them
+    """
+    parts: List[str] = []
+    scanner = _MomentArrayScanner()
+    done = 0  # raw entries already handled
+
+    async for piece in text_chunks:
+        parts.append(piece)
+        entries = scanner.feed(piece)
+        for moment in _normalize_from(entries, 0, done):
+            yield moment
+        done += len(entries)
 
-    return processed_moments
\ No newline at end of file
+    for moment in _normalize_from(_raw_moment_list("".join(parts)) or [], done):
+        yield moment
@@ -1,21 +1,31 @@
 import os
 import json
+import asyncio
+import bisect
+import itertools
+import queue
 import re
 import math
+import threading
 import uuid
 import time
 import traceback
-from typing import Any, Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from src import config
-from src.extraction import parse_moment_response
-from src.cache_utils import get_cached_moments, save_moments_to_cache
+from src.clients import create_async_openai_client, get_openai_client
+from src.extraction import aiter_moment_response, parse_moment_response, parse_multi_chunk_response
+from src.cache_utils import (
+    get_cached_moments,
+    save_moments_to_cache,
+    build_llm_cache_key,
+    get_cached_response,
+    save_response_to_cache,
+)
 
-# Initialize new OpenAI client (reads OPENAI_API_KEY from environment)
-client = OpenAI()
 # Default model from config
 DEFAULT_MODEL = config.PRIMARY_MODEL
 
@@ -86,18 +96,47 @@ IMPORTANT:
 End of instructions.
 """.strip()
 
+# Version tag for cached extraction responses; bump whenever SYSTEM_PROMPT or build_prompt_for_chunk changes
+EXTRACTION_PROMPT_VERSION = "extract-v2"
+
+# JSON mode: the model always returns a single JSON object, so responses parse in one pass
+EXTRACTION_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Extraction quotes exact transcript lines, so sample deterministically; this also makes responses cacheable
+EXTRACTION_TEMPERATURE = 0
+
 def build_prompt_for_chunk(transcript_chunk: str, chunk_index: int, total_chunks: int) -> str:
     """Build the user prompt for a single transcript chunk.
 
-    The chunk index is 1-based.
+    The chunk index is 1-based. Static instructions come first so that every
+    chunk's request shares the longest possible prefix for OpenAI prompt caching.
     """
-    header = f"Chunk {chunk_index} of {total_chunks}. The text below is a continuous portion of a longer talk.\n"
     instructions = (
         f"Find at most {config.MAX_MOMENTS_PER_CHUNK} of the strongest viral clip moments ONLY from this chunk.\n"
         "Return them in the JSON format described in the system prompt.\n"
-        "Transcript chunk:\n"
     )
-    return header + instructions + transcript_chunk
+    header = f"Chunk {chunk_index} of {total_chunks}. The text below is a continuous portion of a longer talk.\n"
+    return instructions + header + "Transcript chunk:\n" + transcript_chunk
+
+
+def build_multi_chunk_prompt(chunks: List[tuple], total_chunks: int) -> str:
+    """Build one user prompt covering several transcript chunks.
+
+    Args:
+        chunks: (chunk_index, chunk_text) pairs; indexes are 1-based
+        total_chunks: Total number of chunks in the transcript
+    """
+    header = (
+        f"Below are {len(chunks)} chunks (of {total_chunks}) from a longer talk. "
+        "Each starts with a line \"=== CHUNK i ===\" and is a continuous portion of the talk.\n"
+    )
+    instructions = (
+        f"For EACH chunk separately, find at most {config.MAX_MOMENTS_PER_CHUNK} of the strongest viral clip moments ONLY from that chunk.\n"
+        "Return ONLY this JSON, with one entry per chunk, where each \"moments\" list uses the format described in the system prompt:\n"
+        '{ "chunks": [ { "chunk_index": i, "moments": [ ... ] } ] }\n'
+    )
+    blocks = "\n\n".join(f"=== CHUNK {idx} ===\n{chunk}" for idx, chunk in chunks)
+    return header + instructions + blocks
 
 
 def call_llm(user_prompt: str, model: Optional[str] = None, temperature: float = 0.3) -> str:
@@ -105,22 +144,76 @@ def call_llm(user_prompt: str, model: Optional[str] = None, temperature: float =
     return call_llm_with_system("You are a helpful assistant.", user_prompt, model=model, temperature=temperature)
 
 
-def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[str] = None, temperature: float = 0.3) -> str:
+def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[str] = None, temperature: float = 0.3, cache_version: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> str:
     """Call OpenAI chat API using the new client interface.
 
     Uses `client.chat.completions.create(...)` from the `openai` package v1+.
+    If `cache_version` is given and temperature is 0, identical calls are served
+    from the response cache (see _llm_cache_key). `response_format` is passed
+    through to the API (e.g. a JSON schema for structured output).
     """
     model = model or DEFAULT_MODEL
 
-    resp = client.chat.completions.create(
+    cache_key = _llm_cache_key(cache_version, model, system_prompt, user_prompt, temperature)
+    if cache_key:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    resp = get_openai_client().chat.completions.create(
         model=model,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
         temperature=temperature,
+        **_request_kwargs(response_format, cache_version),
     )
 
+    _log_prompt_cache(resp)
+    text = _response_text(resp)
+    if cache_key:
+        save_response_to_cache(cache_key, text)
+    return text
+
+
+def _llm_cache_key(cache_version: Optional[str], model: str, system_prompt: str, user_prompt: str, temperature: float) -> Optional[str]:
+    """Return the response cache key for a call, or None if it must not be cached.
+
+    Only deterministic calls (temperature 0) that opt in with a prompt version
+    tag are cached; sampled responses are meant to vary between calls.
+    """
+    if not cache_version or temperature > 0:
+        return None
+    return build_llm_cache_key(cache_version, model, system_prompt, user_prompt)
+
+
+def _request_kwargs(response_format: Optional[Dict[str, Any]], cache_version: Optional[str]) -> Dict[str, Any]:
+    """Optional create() kwargs; empty so plain calls stay unchanged.
+
+    Calls tagged with a prompt version also send it as prompt_cache_key, so
+    parallel requests sharing a static system prompt are routed to the same
+    OpenAI prompt cache.
+    """
+    kwargs: Dict[str, Any] = {}
+    if response_format:
+        kwargs["response_format"] = response_format
+    if cache_version:
+        kwargs["extra_body"] = {"prompt_cache_key": cache_version}
+    return kwargs
+
+
+def _log_prompt_cache(resp: Any) -> None:
+    """Log how many prompt tokens OpenAI served from its prefix cache, if reported."""
+    usage = getattr(resp, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if cached_tokens is not None:
+        print(f"[llm] Prompt tokens: {usage.prompt_tokens}, cached: {cached_tokens}")
+
+
+def _response_text(resp: Any) -> str:
+    """Pull the message text out of a chat completion response."""
     # new client returns choices with message objects
     try:
         return resp.choices[0].message.content.strip()
@@ -128,6 +221,186 @@ def call_llm_with_system(system_prompt: str, user_prompt: str, model: Optional[s
         # Fallback to dict-style access if needed
         return getattr(resp.choices[0].message, "content", str(resp))
 
+
+def call_llm_many(user_prompts: List[str], system_prompt: str = "You are a helpful assistant.", model: Optional[str] = None, temperature: float = 0.3, max_concurrency: int = 4, cache_version: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Run several prompts concurrently and wait for all of them.
+
+    Requests are sent through the async OpenAI client, with at most
+    `max_concurrency` in flight at once. A failing prompt does not affect the others.
+    Every request shares the same system prompt, so a long static system prompt
+    is eligible for OpenAI's automatic prompt-prefix caching.
+
+    Args:
+        user_prompts: User prompts to send
+        system_prompt: System prompt shared by every request
+        model: Model override (defaults to DEFAULT_MODEL)
+        temperature: Sampling temperature
+        max_concurrency: Maximum number of requests in flight
+        cache_version: Prompt version tag enabling the response cache at temperature 0
+        response_format: Optional OpenAI response_format applied to every request
+
+    Returns:
+        List aligned with user_prompts; each item is the response text, or the
+        Exception raised for that prompt
+    """
+    return asyncio.run(_call_llm_many(user_prompts, system_prompt, model, temperature, max_concurrency, cache_version, response_format))
+
+
+def call_llm_batch(user_prompts: List[str], system_prompt: str = "You are a helpful assistant.", model: Optional[str] = None, temperature: float = 0.3, poll_interval: Optional[float] = None, response_format: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Run several prompts through the OpenAI Batch API and wait for the results.
+
+    All prompts are uploaded as one JSONL file and processed asynchronously by
+    OpenAI at reduced cost, so this blocks until the batch finishes (up to the
+    24h completion window). Meant for non-interactive runs.
+
+    Args:
+        user_prompts: User prompts to send
+        system_prompt: System prompt shared by every request
+        model: Model override (defaults to DEFAULT_MODEL)
+        temperature: Sampling temperature
+        poll_interval: Seconds between status checks (defaults to config.BATCH_POLL_INTERVAL_SECONDS)
+        response_format: Optional OpenAI response_format applied to every request
+
+    Returns:
+        List aligned with user_prompts; each item is the response text, or a
+        RuntimeError for a prompt that failed
+
+    Raises:
+        RuntimeError: If the batch as a whole fails, expires or is cancelled
+    """
+    model = model or DEFAULT_MODEL
+    poll_interval = poll_interval or config.BATCH_POLL_INTERVAL_SECONDS
+    client = get_openai_client()
+
+    body_extra = {"response_format": response_format} if response_format else {}
+    lines = [
+        json.dumps({
+            "custom_id": f"prompt_{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": temperature,
+                **body_extra,
+            },
+        })
+        for i, prompt in enumerate(user_prompts)
+    ]
+    batch_file = client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"[llm] Submitted batch {batch.id} with {len(user_prompts)} requests")
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status '{batch.status}'")
+    print(f"[llm] Batch {batch.id} completed: {batch.request_counts}")
+
+    results: List[Any] = [RuntimeError("No result returned for this prompt") for _ in user_prompts]
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            idx = int(record["custom_id"].removeprefix("prompt_"))
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                results[idx] = RuntimeError(f"Batch request failed: {record.get('error') or response.get('body')}")
+            else:
+                results[idx] = (response["body"]["choices"][0]["message"]["content"] or "").strip()
+    return results
+
+
+async def _call_llm_many(user_prompts: List[str], system_prompt: str, model: Optional[str], temperature: float, max_concurrency: int, cache_version: Optional[str], response_format: Optional[Dict[str, Any]]) -> List[Any]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # The async client's connection pool is tied to this event loop, so it lives
+    # only for the duration of the asyncio.run() call.
+    async with create_async_openai_client() as aclient:
+        tasks = [
+            _acall_llm_with_system(aclient, semaphore, system_prompt, prompt, model, temperature, cache_version, response_format)
+            for prompt in user_prompts
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _acall_llm_with_system(aclient: AsyncOpenAI, semaphore: asyncio.Semaphore, system_prompt: str, user_prompt: str, model: Optional[str], temperature: float, cache_version: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> str:
+    """Async counterpart of call_llm_with_system, bounded by `semaphore`."""
+    model = model or DEFAULT_MODEL
+
+    cache_key = _llm_cache_key(cache_version, model, system_prompt, user_prompt, temperature)
+    if cache_key:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    async with semaphore:
+        resp = await aclient.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=temperature,
+            **_request_kwargs(response_format, cache_version),
+        )
+    _log_prompt_cache(resp)
+    text = _response_text(resp)
+    if cache_key:
+        save_response_to_cache(cache_key, text)
+    return text
+
+
+async def _acall_llm_stream(aclient: AsyncOpenAI, semaphore: asyncio.Semaphore, system_prompt: str, user_prompt: str, model: Optional[str] = None, temperature: float = 0.3, cache_version: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """Like _acall_llm_with_system, but yield the response text as it is generated.
+
+    A cached response is yielded in one piece. The semaphore is held while the
+    response streams. A streamed response is saved to the response cache only
+    if it is read to the end; closing the generator early closes the HTTP stream.
+    """
+    model = model or DEFAULT_MODEL
+
+    cache_key = _llm_cache_key(cache_version, model, system_prompt, user_prompt, temperature)
+    if cache_key:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts: List[str] = []
+    async with semaphore:
+        stream = await aclient.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=temperature,
+            stream=True,
+            **_request_kwargs(response_format, cache_version),
+        )
+        try:
+            async for event in stream:
+                delta = event.choices[0].delta.content if event.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            await stream.close()
+
+    if cache_key:
+        save_response_to_cache(cache_key, "".join(parts).strip())
+
 # parse_moment_response is provided by src.extraction; use that implementation
 
 def extract_moments(transcript: str, video_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
@@ -137,8 +410,61 @@ def extract_moments(transcript: str, video_metadata: Optional[Dict] = None) -> L
         transcript: The transcript text to process
         video_metadata: Optional video metadata for better caching
 
+    Returns:
+        Moments in transcript order (chunk by chunk)
+
+    Raises:
+        RuntimeError: if the transcript is empty.
+    """
+    indexed = list(_iter_indexed_moments(transcript, video_metadata))
+    # Stable sort: moments within a chunk keep the model's order
+    indexed.sort(key=itemgetter(0))
+    return [moment for _, moment in indexed]
+
+
+def extract_moments_stream(transcript: str, video_metadata: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+    """Like extract_moments, but yield moments as soon as each chunk finishes.
+
+    Lets callers start downstream work (e.g. cut sheets) while later chunks are
+    still with the LLM. Results are written to the cache once all chunks are done.
+
+    Args:
+        transcript: The transcript text to process
+        video_metadata: Optional video metadata for better caching
+
+    Yields:
+        Moment dictionaries in chunk completion order
+
+    Raises:
+        RuntimeError: if the transcript is empty.
+    """
+    for _, moment in _iter_indexed_moments(transcript, video_metadata):
+        yield moment
+
+
+def extract_indexed_moments_stream(transcript: str, video_metadata: Optional[Dict] = None) -> Iterator[tuple]:
+    """Like extract_moments_stream, but yield (chunk_index, moment) pairs.
+
+    Sorting collected pairs by chunk index (stable) restores transcript order,
+    as extract_moments returns it.
+
+    Args:
+        transcript: The transcript text to process
+        video_metadata: Optional video metadata for better caching
+
+    Yields:
+        (chunk_index, moment) pairs in chunk completion order
+
     Raises:
-        RuntimeError: if no usable moments are found from any chunk.
+        RuntimeError: if the transcript is empty.
+    """
+    return _iter_indexed_moments(transcript, video_metadata)
+
+
+def _iter_indexed_moments(transcript: str, video_metadata: Optional[Dict] = None) -> Iterator[tuple]:
+    """Yield (chunk_index, moment) pairs in completion order; shared by extract_moments*.
+
+    Cached moments are yielded with index 0 since they are stored in transcript order.
     """
     transcript = (transcript or "").strip()
     if not transcript:
@@ -147,51 +473,83 @@ def extract_moments(transcript: str, video_metadata: Optional[Dict] = None) -> L
     # Check cache first
     cached_moments = get_cached_moments(transcript, video_metadata)
     if cached_moments is not None:
-        return cached_moments
+        for moment in cached_moments:
+            yield 0, moment
+        return
 
     # Character-based chunking using config
-    max_chunk_chars = config.CHARS_PER_CHUNK
-    chunks: List[str] = []
-    current = []
-
-    for line in transcript.splitlines():
-        if sum(len(l) for l in current) + len(line) + 1 > max_chunk_chars:
-            if current:
-                chunks.append("\n".join(current))
-                current = []
-        current.append(line)
-    if current:
-        chunks.append("\n".join(current))
+    chunks = [_normalize_chunk_text(chunk) for chunk in _split_into_chunks(transcript, config.CHARS_PER_CHUNK)]
 
     total_chunks = len(chunks)
-    all_moments: List[Dict[str, Any]] = []
-    last_raw_response: Optional[str] = None
+    indexed: List[tuple] = []
 
     print(f"[extract_moments] Transcript length: {len(transcript)} chars, chunks: {total_chunks}")
 
-    # Process chunks in parallel for speed
-    all_moments = _process_chunks_parallel(chunks)
+    # Process chunks in parallel for speed (or as one Batch API job), handing moments out as chunks complete
+    for idx, chunk_moments in _iter_chunks(chunks):
+        for moment in chunk_moments:
+            indexed.append((idx, moment))
+            yield idx, moment
 
-    if not all_moments:
+    if not indexed:
         print(f"[WARN] No viral moments could be extracted from transcript. Transcript length: {len(transcript)} chars, Chunks processed: {total_chunks}.")
-        return []
+        return
+
+    # Cache the results in transcript order
+    indexed.sort(key=itemgetter(0))
+    save_moments_to_cache([moment for _, moment in indexed], transcript, video_metadata)
 
-    # Cache the results
-    save_moments_to_cache(all_moments, transcript, video_metadata)
 
-    return all_moments
+def _split_into_chunks(transcript: str, max_chunk_chars: int) -> List[str]:
+    """Split a transcript into chunks of whole lines, each at most max_chunk_chars long.
 
+    A single line longer than the limit becomes a chunk of its own. Chunk
+    boundaries are found by binary search over cumulative line end offsets,
+    and each chunk is one slice of the transcript (no per-line joins).
+    """
+    # ends[k] is the offset just past line k, including its line break
+    ends = list(itertools.accumulate(len(line) for line in transcript.splitlines(keepends=True)))
+    chunks: List[str] = []
+    i = 0
+    start = 0
 
-def _process_single_chunk(chunk_data: tuple) -> List[Dict[str, Any]]:
-    """Process a single chunk - used for parallel processing.
+    while i < len(ends):
+        # First line that would end past the limit; always take at least one line
+        j = max(bisect.bisect_right(ends, start + max_chunk_chars, lo=i), i + 1)
+        chunks.append(transcript[start:ends[j - 1]].rstrip("\r\n"))
+        start = ends[j - 1]
+        i = j
+
+    return chunks
+
+
+def _normalize_chunk_text(chunk: str) -> str:
+    """Collapse runs of whitespace within each line and drop blank lines.
+
+    Chunks that differ only in spacing or line endings (e.g. a re-fetched or
+    re-pasted transcript) then produce the same prompt, and so the same
+    response cache key. Line breaks between transcript lines are kept.
+    """
+    return "\n".join(" ".join(words) for words in map(str.split, chunk.splitlines()) if words)
+
+
+async def _aiter_single_chunk(aclient: AsyncOpenAI, semaphore: asyncio.Semaphore, chunk_data: tuple) -> AsyncIterator[Dict[str, Any]]:
+    """Stream one chunk's LLM response, yielding each moment as soon as it is parsed.
+
+    Stops reading the response once config.MOMENT_SAFETY_LIMIT moments have
+    arrived. Errors are logged and end the chunk without raising.
 
     Args:
+        aclient: Async OpenAI client for the current event loop
+        semaphore: Bounds the number of requests in flight
         chunk_data: Tuple of (chunk_text, chunk_index, total_chunks)
 
-    Returns:
-        List of moments from this chunk
+    Yields:
+        Moments from this chunk
     """
     chunk, idx, total_chunks = chunk_data
+    count = 0
+    deltas = None
 
     try:
         user_prompt = build_prompt_for_chunk(chunk, idx, total_chunks)
@@ -199,65 +557,305 @@ def _process_single_chunk(chunk_data: tuple) -> List[Dict[str, Any]]:
         # Log chunk info for debugging
         print(f"[extract_moments] Processing chunk {idx}/{total_chunks} (chars: {len(chunk)})")
 
-        raw_response = call_llm_with_system(SYSTEM_PROMPT, user_prompt)
-        snippet = raw_response[:400].replace("\n", " ")
-        print(f"[extract_moments] Chunk {idx}/{total_chunks} raw response (truncated): {snippet}...")
-        if idx == 1:
-            # Print more of the first chunk's raw response for debugging
-            print(f"[extract_moments] Chunk 1 raw response (first 2000 chars):\n{raw_response[:2000]}")
-
-        moments = parse_moment_response(raw_response)
-
-        # Safety limit: truncate if too many moments returned
-        if len(moments) > config.MOMENT_SAFETY_LIMIT:
-            print(f"[extract_moments] Chunk {idx} returned {len(moments)} moments, truncating to {config.MOMENT_SAFETY_LIMIT}")
-            moments = moments[:config.MOMENT_SAFETY_LIMIT]
-
-        if not moments:
-            print(f"[extract_moments] No moments parsed for chunk {idx}")
-            return []
-        else:
-            print(f"[extract_moments] Parsed {len(moments)} moments for chunk {idx}")
-            return moments
+        deltas = _acall_llm_stream(aclient, semaphore, SYSTEM_PROMPT, user_prompt, temperature=EXTRACTION_TEMPERATURE, cache_version=EXTRACTION_PROMPT_VERSION, response_format=EXTRACTION_RESPONSE_FORMAT)
+        async for moment in aiter_moment_response(deltas):
+            yield moment
+            count += 1
+            # Safety limit: stop reading once enough moments have arrived
+            if count >= config.MOMENT_SAFETY_LIMIT:
+                print(f"[extract_moments] Chunk {idx} reached {config.MOMENT_SAFETY_LIMIT} moments, stopping early")
+                break
 
     except Exception as e:
         print(f"[extract_moments] Error processing chunk {idx}: {e}")
         print("[extract_moments] Full traceback:")
         print(traceback.format_exc())
+    finally:
+        if deltas is not None:
+            await deltas.aclose()
+
+    if count:
+        print(f"[extract_moments] Parsed {count} moments for chunk {idx}")
+    else:
+        print(f"[extract_moments] No moments parsed for chunk {idx}")
+
+
+def _parse_chunk_response(raw_response: str, idx: int, total_chunks: int) -> List[Dict[str, Any]]:
+    """Parse one chunk's raw LLM response into moments, applying the safety limit.
+
+    Args:
+        raw_response: Raw response text for the chunk
+        idx: 1-based chunk index
+        total_chunks: Total number of chunks
+
+    Returns:
+        List of moments from this chunk
+    """
+    snippet = raw_response[:400].replace("\n", " ")
+    print(f"[extract_moments] Chunk {idx}/{total_chunks} raw response (truncated): {snippet}...")
+    if idx == 1:
+        # Print more of the first chunk's raw response for debugging
+        print(f"[extract_moments] Chunk 1 raw response (first 2000 chars):\n{raw_response[:2000]}")
+
+    moments = parse_moment_response(raw_response)
+
+    # Safety limit: truncate if too many moments returned
+    if len(moments) > config.MOMENT_SAFETY_LIMIT:
+        print(f"[extract_moments] Chunk {idx} returned {len(moments)} moments, truncating to {config.MOMENT_SAFETY_LIMIT}")
+        moments = moments[:config.MOMENT_SAFETY_LIMIT]
+
+    if not moments:
+        print(f"[extract_moments] No moments parsed for chunk {idx}")
         return []
+    else:
+        print(f"[extract_moments] Parsed {len(moments)} moments for chunk {idx}")
+        return moments
 
 
-def _process_chunks_parallel(chunks: List[str]) -> List[Dict[str, Any]]:
-    """Process chunks in parallel for better performance.
+def _iter_chunks(chunks: List[str]) -> Iterator[tuple]:
+    """Yield (chunk_index, moments) pairs, via the Batch API if enabled, else in parallel.
+
+    If the batch job fails as a whole, falls back to the parallel path.
+    """
+    if config.USE_BATCH_API:
+        try:
+            yield from _iter_chunks_batch(chunks)
+            return
+        except Exception as e:
+            print(f"[extract_moments] Batch API failed, falling back to parallel requests: {e}")
+
+    yield from _iter_chunks_parallel(chunks)
+
+
+def _iter_chunks_batch(chunks: List[str]) -> Iterator[tuple]:
+    """Process all chunks as one OpenAI Batch API job, then yield each chunk's moments.
 
     Args:
         chunks: List of transcript chunks to process
 
-    Returns:
-        Combined list of all moments from all chunks
+    Yields:
+        (chunk_index, moments) for each chunk that produced any
+    """
+    total_chunks = len(chunks)
+    prompts = [build_prompt_for_chunk(chunk, idx, total_chunks) for idx, chunk in enumerate(chunks, start=1)]
+    responses = call_llm_batch(prompts, system_prompt=SYSTEM_PROMPT, temperature=EXTRACTION_TEMPERATURE, response_format=EXTRACTION_RESPONSE_FORMAT)
+
+    for idx, raw_response in enumerate(responses, start=1):
+        if isinstance(raw_response, Exception):
+            print(f"[extract_moments] Error processing chunk {idx}: {raw_response}")
+            continue
+        try:
+            chunk_moments = _parse_chunk_response(raw_response, idx, total_chunks)
+        except Exception as e:
+            print(f"[extract_moments] Error parsing chunk {idx}: {e}")
+            continue
+        if chunk_moments:
+            yield idx, chunk_moments
+
+
+def _iter_chunks_parallel(chunks: List[str]) -> Iterator[tuple]:
+    """Process chunks concurrently, yielding moments as soon as any request parses one.
+
+    Requests run as asyncio tasks on one background event loop, with at most
+    config.MAX_PARALLEL_CHUNKS in flight. Each task streams its chunk's
+    response and hands every finished moment to the caller through a queue,
+    so the first moments arrive well before the slowest chunk completes.
+    Requests are started longest first so a big one never starts last and
+    dominates the total time. With config.CHUNKS_PER_REQUEST > 1, small
+    neighbouring chunks share a request (see _pack_chunks).
+
+    Args:
+        chunks: List of transcript chunks to process
+
+    Yields:
+        (chunk_index, [moment]) pairs, in arrival order
     """
-    all_moments = []
     total_chunks = len(chunks)
 
-    # Prepare chunk data for parallel processing
+    # Prepare chunk data for parallel processing, grouped per request, longest requests first
     chunk_data = [(chunk, idx, total_chunks) for idx, chunk in enumerate(chunks, start=1)]
+    groups = _pack_chunks(chunk_data)
+    groups.sort(key=lambda group: sum(len(data[0]) for data in group), reverse=True)
+
+    # Tasks put (idx, [moment]) for each moment and None when their request is done;
+    # if the event loop itself fails, (exception,) is put instead
+    results: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+    # The event loop runs in its own thread so this generator can keep yielding while requests are in flight
+    loop_thread = _GroupLoopThread(groups, results)
+    loop_thread.start()
+    finished = False
+    try:
+        pending = len(groups)
+        while pending:
+            item = results.get()
+            if item is None:
+                pending -= 1
+            elif len(item) == 1:
+                raise RuntimeError(f"Chunk processing failed: {item[0]}") from item[0]
+            else:
+                yield item
+        finished = True
+    finally:
+        if not finished:
+            # Closed early (or failed): don't wait for requests nobody will read
+            loop_thread.cancel()
+        loop_thread.join()
+
+    # The loop can still fail after every request is done (e.g. closing the client)
+    if loop_thread.error is not None:
+        raise RuntimeError(f"Chunk processing failed: {loop_thread.error}") from loop_thread.error
+
+
+class _GroupLoopThread(threading.Thread):
+    """Background thread running _process_groups_async on its own event loop.
+
+    Failures of the loop itself (e.g. creating the client) are stored in
+    `error` and reported through the results queue as (exception,), so the
+    consumer never waits forever; errors inside a request are handled per
+    group. cancel() stops the pending requests from another thread.
+    """
+
+    def __init__(self, groups: List[List[tuple]], results: "queue.Queue[Optional[tuple]]") -> None:
+        super().__init__(daemon=True)
+        self._groups = groups
+        self._results = results
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except asyncio.CancelledError:
+            pass  # cancel() was called; the consumer is gone
+        except BaseException as e:
+            self.error = e
+            self._results.put((e,))
+
+    async def _main(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+        try:
+            await _process_groups_async(self._groups, self._results)
+        finally:
+            # The loop closes after this returns; cancel() must no longer schedule on it
+            with self._lock:
+                self._loop = None
+
+    def cancel(self) -> None:
+        """Cancel all pending and in-flight requests (safe to call from any thread)."""
+        with self._lock:
+            self._cancelled = True
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+
+async def _process_groups_async(groups: List[List[tuple]], results: "queue.Queue[Optional[tuple]]") -> None:
+    """Run every request group concurrently, bounded by config.MAX_PARALLEL_CHUNKS."""
+    # Semaphore waiters are served in order, so requests start in the order of `groups`
+    semaphore = asyncio.Semaphore(config.MAX_PARALLEL_CHUNKS)
+
+    # The async client's connection pool is tied to this event loop, so it lives
+    # only for the duration of the asyncio.run() call.
+    async with create_async_openai_client() as aclient:
+        await asyncio.gather(*(_process_group_async(aclient, semaphore, group, results) for group in groups))
+
+
+async def _process_group_async(aclient: AsyncOpenAI, semaphore: asyncio.Semaphore, group: List[tuple], results: "queue.Queue[Optional[tuple]]") -> None:
+    """Extract one request group's moments into `results`, then put None."""
+    try:
+        if len(group) == 1:
+            async for moment in _aiter_single_chunk(aclient, semaphore, group[0]):
+                results.put((group[0][1], [moment]))
+        else:
+            for idx, chunk_moments in await _process_chunk_group(aclient, semaphore, group):
+                for moment in chunk_moments:
+                    results.put((idx, [moment]))
+    except Exception as e:
+        print(f"[extract_moments] Parallel processing error for chunks {[data[1] for data in group]}: {e}")
+    finally:
+        results.put(None)
+
+
+def _pack_chunks(chunk_data: List[tuple]) -> List[List[tuple]]:
+    """Group consecutive chunks into requests of up to config.CHUNKS_PER_REQUEST chunks.
+
+    A group is closed once adding the next chunk would exceed
+    CHARS_PER_CHUNK * CHUNKS_PER_REQUEST characters, so oversize chunks keep
+    a request to themselves and the expected output stays bounded.
+
+    Args:
+        chunk_data: (chunk_text, chunk_index, total_chunks) tuples in transcript order
+
+    Returns:
+        List of groups, each a non-empty list of chunk_data tuples
+    """
+    per_request = max(1, config.CHUNKS_PER_REQUEST)
+    max_chars = config.CHARS_PER_CHUNK * per_request
+    groups: List[List[tuple]] = []
+    current: List[tuple] = []
+    current_len = 0
+
+    for data in chunk_data:
+        if current and (len(current) >= per_request or current_len + len(data[0]) > max_chars):
+            groups.append(current)
+            current = []
+            current_len = 0
+        current.append(data)
+        current_len += len(data[0])
+    if current:
+        groups.append(current)
+
+    return groups
+
 
-    # Process chunks in parallel with limited concurrency
-    with ThreadPoolExecutor(max_workers=config.MAX_PARALLEL_CHUNKS) as executor:
-        # Submit all chunks
-        future_to_chunk = {executor.submit(_process_single_chunk, data): data[1] for data in chunk_data}
-
-        # Collect results as they complete
-        for future in as_completed(future_to_chunk):
-            chunk_idx = future_to_chunk[future]
-            try:
-                chunk_moments = future.result()
-                if chunk_moments:
-                    all_moments.extend(chunk_moments)
-            except Exception as e:
-                print(f"[extract_moments] Parallel processing error for chunk {chunk_idx}: {e}")
-
-    return all_moments
+async def _process_chunk_group(aclient: AsyncOpenAI, semaphore: asyncio.Semaphore, group: List[tuple]) -> List[tuple]:
+    """Extract moments for several chunks with a single LLM request.
+
+    Errors are logged and end the group without raising.
+
+    Args:
+        aclient: Async OpenAI client for the current event loop
+        semaphore: Bounds the number of requests in flight
+        group: (chunk_text, chunk_index, total_chunks) tuples sent together
+
+    Returns:
+        (chunk_index, moments) for each chunk that produced any
+    """
+    indexes = [data[1] for data in group]
+    total_chunks = group[0][2]
+
+    try:
+        user_prompt = build_multi_chunk_prompt([(data[1], data[0]) for data in group], total_chunks)
+        print(f"[extract_moments] Processing chunks {indexes}/{total_chunks} in one request (chars: {sum(len(data[0]) for data in group)})")
+
+        raw_response = await _acall_llm_with_system(aclient, semaphore, SYSTEM_PROMPT, user_prompt, model=None, temperature=EXTRACTION_TEMPERATURE, cache_version=EXTRACTION_PROMPT_VERSION, response_format=EXTRACTION_RESPONSE_FORMAT)
+        results = parse_multi_chunk_response(raw_response)
+    except Exception as e:
+        print(f"[extract_moments] Error processing chunks {indexes}: {e}")
+        print("[extract_moments] Full traceback:")
+        print(traceback.format_exc())
+        return []
+
+    grouped: List[tuple] = []
+    for idx in indexes:
+        moments = results.get(idx, [])
+        # Safety limit: truncate if too many moments returned
+        if len(moments) > config.MOMENT_SAFETY_LIMIT:
+            print(f"[extract_moments] Chunk {idx} returned {len(moments)} moments, truncating to {config.MOMENT_SAFETY_LIMIT}")
+            moments = moments[:config.MOMENT_SAFETY_LIMIT]
+        if moments:
+            print(f"[extract_moments] Parsed {len(moments)} moments for chunk {idx}")
+            grouped.append((idx, moments))
+        else:
+            print(f"[extract_moments] No moments parsed for chunk {idx}")
+    return grouped
 
 
 # Clean function boundaries for future 2-model pipeline
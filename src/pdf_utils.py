@@ -23,20 +23,27 @@ def clips_to_pdf(moments_with_cuts, metadata=None) -> bytes:
     y = height - 50
     line_height = 14
 
-    def write_line(text: str = "", bold: bool = False):
-        nonlocal y
+    # All lines on a page go into one text object; fonts change only when bold toggles
+    text = c.beginText(x_margin, y)
+    current_font = None
+
+    def write_line(line: str = "", bold: bool = False):
+        nonlocal y, text, current_font
         if y < 60:  # new page if too low
+            c.drawText(text)
             c.showPage()
             y = height - 50
-        if bold:
-            c.setFont("Helvetica-Bold", 10)
-        else:
-            c.setFont("Helvetica", 10)
+            text = c.beginText(x_margin, y)
+            current_font = None
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        if font != current_font:
+            text.setFont(font, 10, leading=line_height)
+            current_font = font
         # Truncate very long lines so they don't run off the page
         max_chars = 110
-        if len(text) > max_chars:
-            text = text[: max_chars - 3] + "..."
-        c.drawString(x_margin, y, text)
+        if len(line) > max_chars:
+            line = line[: max_chars - 3] + "..."
+        text.textLine(line)
         y -= line_height
 
     # Header
@@ -125,6 +132,7 @@ def clips_to_pdf(moments_with_cuts, metadata=None) -> bytes:
 
         write_line("-" * 60)
 
+    c.drawText(text)
     c.showPage()
     c.save()
     pdf = buffer.getvalue()
@@ -1,13 +1,29 @@
 """Transcript utilities for YouTube video processing via Apify.
 
-Handles video ID extraction, synchronous Apify API calls, and transcript formatting.
+Handles video ID extraction, synchronous and async Apify API calls, and transcript formatting.
 """
 
+import asyncio
+import json
 import re
+import httpx
 import requests
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from urllib.parse import urlparse, parse_qs
 from src import config
+from src.clients import create_apify_async_client, get_apify_session
+from src.cache_utils import get_cached_transcript, save_transcript_to_cache
+
+try:
+    import orjson  # Optional: faster decoding of large transcript payloads
+except ImportError:
+    orjson = None
+
+# A bare YouTube video ID: exactly 11 URL-safe base64 characters
+_VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+# Read size when streaming the Apify response body
+_DOWNLOAD_CHUNK_BYTES = 1 << 16
 
 
 def extract_video_id_from_url(youtube_url: str) -> str:
@@ -36,7 +52,7 @@ def extract_video_id_from_url(youtube_url: str) -> str:
     raw = youtube_url.strip().strip('"').strip("'").strip("/").strip()
 
     # If it's already an 11-character alphanumeric ID, validate and return it
-    if re.fullmatch(r"[A-Za-z0-9_-]{11}", raw):
+    if _VIDEO_ID_RE.fullmatch(raw):
         return raw
 
     # Otherwise parse as URL
@@ -76,7 +92,7 @@ def extract_video_id_from_url(youtube_url: str) -> str:
         video_id = video_id.strip().strip('"').strip("'").strip("/").strip()
 
     # Validate it's exactly 11 characters
-    if not video_id or not re.fullmatch(r"[A-Za-z0-9_-]{11}", video_id):
+    if not video_id or not _VIDEO_ID_RE.fullmatch(video_id):
         raise RuntimeError(
             f"Invalid YouTube URL format. Must contain a valid 11-character video ID: {youtube_url!r}"
         )
@@ -92,48 +108,7 @@ def normalize_youtube_url(raw_url: str) -> str:
 
     Raises RuntimeError if a valid 11-char video ID cannot be extracted.
     """
-    if not raw_url:
-        raise RuntimeError("Empty YouTube URL")
-
-    url = raw_url.strip()
-
-    # Add scheme if missing
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "https://" + url
-
-    parsed = urlparse(url)
-    host = (parsed.netloc or "").lower()
-    path = parsed.path or ""
-    query = parse_qs(parsed.query or "")
-
-    video_id = None
-
-    # youtu.be/dQw4w9WgXcQ
-    if "youtu.be" in host:
-        video_id = path.lstrip("/")
-
-    # youtube.com
-    elif "youtube.com" in host:
-        # /watch?v=ID
-        if path.startswith("/watch"):
-            video_id = query.get("v", [None])[0]
-        # /shorts/ID
-        elif path.startswith("/shorts/"):
-            parts = path.split("/")
-            if len(parts) >= 3:
-                video_id = parts[2]
-        # /embed/ID
-        elif path.startswith("/embed/"):
-            parts = path.split("/")
-            if len(parts) >= 3:
-                video_id = parts[2]
-
-    if not video_id or len(video_id) != 11:
-        raise RuntimeError(
-            f"Invalid YouTube URL format. Must contain an 11-character video ID: {raw_url!r}"
-        )
-
-    return f"https://www.youtube.com/watch?v={video_id}"
+    return f"https://www.youtube.com/watch?v={extract_video_id_from_url(raw_url)}"
 
 
 def seconds_to_timestamp(seconds: float) -> str:
@@ -150,27 +125,18 @@ def seconds_to_timestamp(seconds: float) -> str:
     return f"{minutes:02d}:{secs:05.2f}"
 
 
-def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
-    """Call Apify Actor to get YouTube transcript with cleaned video ID.
+def _apify_request(youtube_url: str, language: str) -> Tuple[str, Dict[str, str]]:
+    """Build the run-sync endpoint URL and payload for one video.
 
     Args:
         youtube_url: YouTube video URL (any format)
-        language: Language code for transcript (default: "en")
+        language: Language code for transcript
 
     Returns:
-        Raw response data from Apify Actor
-
-    Raises:
-        RuntimeError: If API call fails or returns invalid data
+        Tuple of (endpoint_url, payload) with a canonical video URL in the payload
     """
     config.validate_config()
 
-    # Extract clean 11-character video ID
-    video_id = extract_video_id_from_url(youtube_url)
-
-    # Build canonical URL from clean video ID
-    canonical_url = f"https://www.youtube.com/watch?v={video_id}"
-
     # Build the synchronous endpoint URL
     url = (
         f"https://api.apify.com/v2/acts/"
@@ -178,22 +144,29 @@ def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
         f"?token={config.APIFY_TOKEN}"
     )
 
-    # Prepare payload with canonical URL
+    # Prepare payload with canonical URL built from the clean 11-character video ID
     payload = {
-        "youtube_url": canonical_url,
+        "youtube_url": normalize_youtube_url(youtube_url),
         "language": (language or "en").strip(),
     }
+    return url, payload
 
-    try:
-        # Call the synchronous endpoint that returns dataset items directly
-        response = requests.post(url, json=payload, timeout=300)
 
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"Failed to call Apify Actor ({response.status_code}): {response.text}"
-            )
+def _item_from_apify_body(body: bytes, canonical_url: str) -> Dict[str, Any]:
+    """Decode an Apify dataset response and return the single video item.
 
-        items = response.json()
+    Args:
+        body: Raw JSON response body
+        canonical_url: Canonical video URL, used in error messages
+
+    Returns:
+        The video item containing a non-empty transcript
+
+    Raises:
+        RuntimeError: If the payload is empty, failed, or has no transcript
+    """
+    try:
+        items = orjson.loads(body) if orjson is not None else json.loads(body)
 
         if not isinstance(items, list) or not items:
             raise RuntimeError(
@@ -218,12 +191,81 @@ def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
 
         return item
 
-    except requests.RequestException as e:
-        raise RuntimeError(f"Failed to call Apify Actor: {e}")
     except (KeyError, ValueError) as e:
         raise RuntimeError(f"Unexpected response format from Apify Actor: {e}")
 
 
+def call_apify_actor(youtube_url: str, language: str = "en") -> Dict[str, Any]:
+    """Call Apify Actor to get YouTube transcript with cleaned video ID.
+
+    Args:
+        youtube_url: YouTube video URL (any format)
+        language: Language code for transcript (default: "en")
+
+    Returns:
+        Raw response data from Apify Actor
+
+    Raises:
+        RuntimeError: If API call fails or returns invalid data
+    """
+    url, payload = _apify_request(youtube_url, language)
+
+    try:
+        # Call the synchronous endpoint that returns dataset items directly.
+        # Stream the body into one growable buffer so long transcripts are held once, not as chunks + a joined copy.
+        with get_apify_session().post(url, json=payload, timeout=300, stream=True) as response:
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"Failed to call Apify Actor ({response.status_code}): {response.text}"
+                )
+
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_BYTES):
+                body += chunk
+
+    except requests.RequestException as e:
+        raise RuntimeError(f"Failed to call Apify Actor: {e}")
+
+    return _item_from_apify_body(body, payload["youtube_url"])
+
+
+async def call_apify_actor_async(
+    youtube_url: str,
+    language: str = "en",
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    """Async version of call_apify_actor, so several videos can be fetched at once.
+
+    Args:
+        youtube_url: YouTube video URL (any format)
+        language: Language code for transcript (default: "en")
+        client: Shared client from create_apify_async_client(); a temporary one is used if omitted
+
+    Returns:
+        Raw response data from Apify Actor
+
+    Raises:
+        RuntimeError: If API call fails or returns invalid data
+    """
+    if client is None:
+        async with create_apify_async_client() as own_client:
+            return await call_apify_actor_async(youtube_url, language, own_client)
+
+    url, payload = _apify_request(youtube_url, language)
+
+    try:
+        response = await client.post(url, json=payload)
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Failed to call Apify Actor: {e}")
+
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"Failed to call Apify Actor ({response.status_code}): {response.text}"
+        )
+
+    return _item_from_apify_body(response.content, payload["youtube_url"])
+
+
 def flatten_transcript(item: Dict[str, Any]) -> str:
     """Convert Apify transcript data to formatted text.
 
@@ -245,36 +287,55 @@ def flatten_transcript(item: Dict[str, Any]) -> str:
         if not isinstance(transcript_segments, list):
             raise RuntimeError("Transcript is not in expected list format")
 
-        lines = []
+        lines: List[str] = []
+        append = lines.append
         for segment in transcript_segments:
-            if not isinstance(segment, dict):
-                continue
-
-            text = segment.get("text", "").strip()
-            start = segment.get("start", 0)
-            end = segment.get("end", 0)
-
-            if not text:
+            try:
+                text = segment.get("text", "").strip()
+                if not text:
+                    continue
+
+                start = segment.get("start", 0)
+                end = segment.get("end", 0)
+
+                # seconds_to_timestamp inlined for both ends: MM:SS.xx
+                append(f"[{int(start // 60):02d}:{start % 60:05.2f}–{int(end // 60):02d}:{end % 60:05.2f}] {text}")
+            except (AttributeError, TypeError):
+                # Segment is not a dict or has malformed fields
                 continue
 
-            start_ts = seconds_to_timestamp(start)
-            end_ts = seconds_to_timestamp(end)
-
-            lines.append(f"[{start_ts}–{end_ts}] {text}")
-
         return "\n".join(lines)
 
     except KeyError as e:
         raise RuntimeError(f"Missing required field in transcript data: {e}")
 
 
+def _transcript_metadata(item: Dict[str, Any], youtube_url: str, language: str) -> Dict[str, Any]:
+    """Extract the metadata fields the app uses from an Apify item."""
+    return {
+        "title": item.get("title", ""),
+        "channel_name": item.get("channel_name", ""),
+        "video_id": item.get("video_id", ""),
+        "url": item.get("url", youtube_url),
+        "duration_seconds": item.get("duration_seconds", 0),
+        "thumbnail": item.get("thumbnail", ""),
+        "language": item.get("language", language),
+        "view_count": item.get("view_count", 0),
+        "like_count": item.get("like_count", 0),
+        "comment_count": item.get("comment_count", 0),
+        "published_at": item.get("published_at", ""),
+        "is_auto_generated": item.get("is_auto_generated", False)
+    }
+
+
 def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple[str, Dict[str, Any]]:
     """Get formatted transcript and metadata from YouTube URL.
 
     Main function that orchestrates the full process:
-    1. Call Apify Actor synchronously using run-sync-get-dataset-items
-    2. Format transcript text
-    3. Extract metadata
+    1. Return the on-disk cached transcript for this video/language, if any
+    2. Call Apify Actor synchronously using run-sync-get-dataset-items
+    3. Format transcript text
+    4. Extract metadata and cache the result
 
     Args:
         youtube_url: YouTube video URL
@@ -286,6 +347,13 @@ def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple
     Raises:
         RuntimeError: If any step in the process fails
     """
+    # Transcripts never change for a video, so reuse any earlier fetch
+    video_id = extract_video_id_from_url(youtube_url)
+    language = (language or "en").strip()
+    cached = get_cached_transcript(video_id, language)
+    if cached is not None:
+        return cached
+
     # Get raw data from Apify
     item = call_apify_actor(youtube_url, language)
 
@@ -293,19 +361,62 @@ def get_transcript_from_youtube(youtube_url: str, language: str = "en") -> Tuple
     transcript_text = flatten_transcript(item)
 
     # Extract metadata
-    metadata = {
-        "title": item.get("title", ""),
-        "channel_name": item.get("channel_name", ""),
-        "video_id": item.get("video_id", ""),
-        "url": item.get("url", youtube_url),
-        "duration_seconds": item.get("duration_seconds", 0),
-        "thumbnail": item.get("thumbnail", ""),
-        "language": item.get("language", language),
-        "view_count": item.get("view_count", 0),
-        "like_count": item.get("like_count", 0),
-        "comment_count": item.get("comment_count", 0),
-        "published_at": item.get("published_at", ""),
-        "is_auto_generated": item.get("is_auto_generated", False)
-    }
+    metadata = _transcript_metadata(item, youtube_url, language)
+
+    save_transcript_to_cache(video_id, language, transcript_text, metadata)
+    return transcript_text, metadata
+
+
+def get_transcripts_from_youtube_many(
+    youtube_urls: List[str], language: str = "en"
+) -> List[Union[Tuple[str, Dict[str, Any]], RuntimeError]]:
+    """Get transcripts for several videos, overlapping the Apify calls.
+
+    Cached videos are served from disk; the rest are fetched concurrently over
+    one async client. A failure for one video does not abort the others.
+
+    Args:
+        youtube_urls: YouTube video URLs
+        language: Language code for all transcripts
+
+    Returns:
+        One entry per URL, in input order: (transcript_text, metadata) on
+        success, or the RuntimeError raised for that video
+    """
+    language = (language or "en").strip()
+    results: List[Any] = [None] * len(youtube_urls)
+    pending: List[Tuple[int, str, str]] = []
+    for i, youtube_url in enumerate(youtube_urls):
+        try:
+            video_id = extract_video_id_from_url(youtube_url)
+        except RuntimeError as e:
+            results[i] = e
+            continue
+        cached = get_cached_transcript(video_id, language)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append((i, youtube_url, video_id))
+
+    async def _fetch_all() -> List[Any]:
+        async with create_apify_async_client() as client:
+            return await asyncio.gather(
+                *(call_apify_actor_async(url, language, client) for _, url, _ in pending),
+                return_exceptions=True,
+            )
+
+    if pending:
+        for (i, youtube_url, video_id), item in zip(pending, asyncio.run(_fetch_all())):
+            if isinstance(item, BaseException):
+                results[i] = item if isinstance(item, RuntimeError) else RuntimeError(str(item))
+                continue
+            try:
+                transcript_text = flatten_transcript(item)
+            except RuntimeError as e:
+                results[i] = e
+                continue
+            metadata = _transcript_metadata(item, youtube_url, language)
+            save_transcript_to_cache(video_id, language, transcript_text, metadata)
+            results[i] = (transcript_text, metadata)
 
-    return transcript_text, metadata
\ No newline at end of file
+    return results
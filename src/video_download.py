@@ -1,6 +1,18 @@
 from pathlib import Path
+from typing import Optional
+
 import yt_dlp
 
+from src.transcript_utils import extract_video_id_from_url
+
+
+def _existing_download(out_dir: Path, video_id: str) -> Optional[Path]:
+    """Return the previously downloaded mp4 for `video_id`, or None if there is none."""
+    candidate = out_dir / f"{video_id}.mp4"
+    if candidate.is_file() and candidate.stat().st_size > 0:
+        return candidate
+    return None
+
 
 def download_youtube_video(url: str, output_dir: str = "videos") -> str:
     """
@@ -8,20 +20,41 @@ def download_youtube_video(url: str, output_dir: str = "videos") -> str:
 
     - Always outputs an .mp4 file
     - Uses the video ID as the filename
+    - Reuses an existing non-empty `<video_id>.mp4` instead of downloading again
     """
     out_dir = Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    # Cheap check first: most URLs carry the video ID, so no network round trip is needed
+    try:
+        existing = _existing_download(out_dir, extract_video_id_from_url(url))
+    except RuntimeError:
+        existing = None
+    if existing:
+        return str(existing)
+
     ydl_opts = {
         "outtmpl": str(out_dir / "%(id)s.%(ext)s"),
-        "format": "bestvideo*+bestaudio/best",  # Force video+audio merge
-        "merge_output_format": "mp4",
+        # Prefer H.264 mp4 + m4a up to 1080p: merging those is a plain remux into mp4.
+        # Progressive mp4 is next (no merge at all), then anything available.
+        "format": (
+            "bestvideo[ext=mp4][height<=1080]+bestaudio[ext=m4a]"
+            "/best[ext=mp4][height<=1080]"
+            "/bestvideo*+bestaudio/best"
+        ),
+        "merge_output_format": "mp4",  # Only used when separate streams are merged
         "quiet": True,
         "no_warnings": True,
     }
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
+        # Resolve the ID with an info-only call, then download from the same info
+        info = ydl.extract_info(url, download=False)
+        existing = _existing_download(out_dir, info["id"])
+        if existing:
+            return str(existing)
+
+        info = ydl.process_ie_result(info, download=True)
         file_path = Path(ydl.prepare_filename(info))
         # Normalize extension to .mp4 if needed
         if file_path.suffix.lower() != ".mp4":